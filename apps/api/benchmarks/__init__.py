@@ -0,0 +1,8 @@
+"""
+Benchmarks
+
+Microbenchmarks for the CPU-bound hot paths of the API.
+
+Run from apps/api:
+    python -m benchmarks.run
+"""
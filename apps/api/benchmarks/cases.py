@@ -0,0 +1,214 @@
+"""
+Benchmark Cases
+
+Each case builds its input once per size and returns a zero-argument
+callable that runs the measured code. Inputs are deterministic so runs
+on different commits are comparable.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Coroutine, Dict, List
+import json
+
+from models import Scan, ScanStatus, ToolType
+from routers.scans import Finding, ScanCreate, ScanJSONResponse, ScanResponse, ScanSummary, scan_to_dict
+from routers.sync import SyncRequest
+from services.findings import FindingScope, finding_rows
+from services.issues import issue_rows
+from services.rollups import record_rollups, scan_rollup
+
+SEVERITIES = ("critical", "high", "medium", "low")
+
+
+# =============================================================================
+# Inputs
+# =============================================================================
+
+def make_findings(n: int) -> List[Dict[str, Any]]:
+    """n findings shaped like CLI output."""
+    return [
+        {
+            "id": f"finding-{i}",
+            "resource_type": "aws_s3_bucket",
+            "resource_id": f"arn:aws:s3:::bucket-{i}",
+            "issue": f"Bucket bucket-{i} allows public read access",
+            "severity": SEVERITIES[i % len(SEVERITIES)],
+            "remediation": "Enable S3 Block Public Access on the bucket",
+        }
+        for i in range(n)
+    ]
+
+
+def make_payload(n: int) -> Dict[str, Any]:
+    """Sync/create payload with n findings."""
+    findings = make_findings(n)
+    summary = {"resources_scanned": n * 2, "issues_found": n}
+    for severity in SEVERITIES:
+        summary[severity] = sum(1 for f in findings if f["severity"] == severity)
+    return {
+        "tool": "verify",
+        "provider": "aws",
+        "region": "us-east-1",
+        "status": "completed",
+        "summary": summary,
+        "findings": findings,
+    }
+
+
+def make_scan(index: int = 0, summary: Dict[str, Any] = None) -> Scan:
+    """Transient Scan row as loaded by the read endpoints."""
+    return Scan(
+        id=f"00000000-0000-0000-0000-{index:012d}",
+        user_id="user_bench",
+        tool=ToolType.VERIFY,
+        provider="aws",
+        region="us-east-1",
+        status=ScanStatus.COMPLETED,
+        summary=summary or make_payload(0)["summary"],
+        project_id=None,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        updated_at=None,
+    )
+
+
+class NullSession:
+    """Session whose statements are built but never sent anywhere."""
+    
+    async def execute(self, statement: Any, params: Any = None) -> None:
+        return None
+
+
+def run_sync(coro: Coroutine) -> Any:
+    """Run a coroutine that never suspends, without an event loop."""
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    raise RuntimeError("coroutine suspended")
+
+
+# =============================================================================
+# Cases
+# =============================================================================
+
+def sync_request_validate(n: int) -> Callable[[], Any]:
+    """SyncRequest validation of a parsed JSON body (what FastAPI does)."""
+    payload = make_payload(n)
+    return lambda: SyncRequest.model_validate(payload)
+
+
+def sync_request_validate_json(n: int) -> Callable[[], Any]:
+    """SyncRequest parsing and validation straight from raw JSON bytes."""
+    body = json.dumps(make_payload(n)).encode()
+    return lambda: SyncRequest.model_validate_json(body)
+
+
+def scan_create_validate(n: int) -> Callable[[], Any]:
+    """ScanCreate validation of a parsed JSON body."""
+    payload = make_payload(n)
+    return lambda: ScanCreate.model_validate(payload)
+
+
+def sync_model_dump(n: int) -> Callable[[], Any]:
+    """The findings model_dump round-trip in sync_scan."""
+    request = SyncRequest.model_validate(make_payload(n))
+    return lambda: [f.model_dump() for f in request.findings]
+
+
+def scan_response_pydantic(n: int) -> Callable[[], Any]:
+    """ScanResponse built from Finding models and encoded by pydantic (the pre-orjson path)."""
+    scan = make_scan()
+    findings = make_findings(n)
+    
+    def run():
+        response = ScanResponse(
+            id=scan.id,
+            tool=scan.tool.value,
+            provider=scan.provider,
+            region=scan.region,
+            status=scan.status.value,
+            summary=ScanSummary(**scan.summary),
+            findings=[Finding(**f) for f in findings],
+            project_id=scan.project_id,
+            created_at=scan.created_at,
+            updated_at=scan.updated_at,
+        )
+        return response.model_dump_json()
+    
+    return run
+
+
+def scan_response_orjson(n: int) -> Callable[[], Any]:
+    """The ScanJSONResponse body of get_scan and create_scan."""
+    scan = make_scan()
+    findings = make_findings(n)
+    return lambda: ScanJSONResponse(scan_to_dict(scan, findings)).body
+
+
+def list_page(scans: List[Scan], findings: Dict[str, List[Dict[str, Any]]]) -> bytes:
+    """The ScanJSONResponse body of one list_scans page."""
+    return ScanJSONResponse({
+        "scans": [scan_to_dict(s, findings.get(s.id)) for s in scans],
+        "total": None,
+        "limit": len(scans),
+        "offset": 0,
+        "next_cursor": None,
+    }).body
+
+
+def list_scans_summaries(n: int) -> Callable[[], Any]:
+    """A list_scans page of n scans, summaries only (the default)."""
+    scans = [make_scan(i) for i in range(n)]
+    return lambda: list_page(scans, {})
+
+
+def list_scans_findings(n: int) -> Callable[[], Any]:
+    """A list_scans page of 20 scans with n findings each (include=findings)."""
+    scans = [make_scan(i) for i in range(20)]
+    findings = {s.id: make_findings(n) for s in scans}
+    return lambda: list_page(scans, findings)
+
+
+def ingest_rows(n: int) -> Callable[[], Any]:
+    """scan_findings and issue rows for a scan of n findings, fingerprints included."""
+    findings = make_findings(n)
+    scope = FindingScope(ToolType.VERIFY, "aws", "us-east-1")
+    created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    
+    def run():
+        rows = finding_rows("scan_bench", created_at, scope, findings)
+        issues = issue_rows("user_bench", "scan_bench", scope, findings)
+        return rows, issues
+    
+    return run
+
+
+def record_rollups_batch(n: int) -> Callable[[], Any]:
+    """Rollup deltas and the merged upsert for a write_scans batch of n scans."""
+    summary = make_payload(0)["summary"]
+    tools = list(ToolType)
+    session = NullSession()
+    
+    def run():
+        deltas = [
+            scan_rollup("user_bench", tools[i % len(tools)], ScanStatus.COMPLETED, summary) for i in range(n)
+        ]
+        return run_sync(record_rollups(session, deltas))
+    
+    return run
+
+
+# Case name -> (builder, sizes). Sizes are findings per scan, or scans
+# for the summary list and rollup cases.
+CASES: Dict[str, Any] = {
+    "sync_request_validate": (sync_request_validate, (10, 1_000, 100_000)),
+    "sync_request_validate_json": (sync_request_validate_json, (10, 1_000, 100_000)),
+    "scan_create_validate": (scan_create_validate, (10, 1_000, 100_000)),
+    "sync_model_dump": (sync_model_dump, (10, 1_000, 100_000)),
+    "scan_response_pydantic": (scan_response_pydantic, (10, 1_000, 100_000)),
+    "scan_response_orjson": (scan_response_orjson, (10, 1_000, 100_000)),
+    "list_scans_summaries": (list_scans_summaries, (20, 100)),
+    "list_scans_findings": (list_scans_findings, (10, 1_000)),
+    "ingest_rows": (ingest_rows, (10, 1_000, 10_000)),
+    "record_rollups_batch": (record_rollups_batch, (10, 500)),
+}
@@ -5,8 +5,14 @@ Async SQLAlchemy setup for PostgreSQL.
 """
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import ForeignKeyConstraint, MetaData, inspect
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import DeclarativeBase
-from typing import AsyncGenerator
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import Any, AsyncGenerator, Dict, Optional
+import time
+import uuid
 
 from config import settings
 
@@ -19,11 +25,96 @@ def get_async_database_url(url: str) -> str:
     return url
 
 
+class PoolStats:
+    """Counters for connection checkouts from the pool."""
+    
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.connects = 0
+        self.connect_seconds_total = 0.0
+    
+    def record(self, wait_seconds: float, connect_seconds: Optional[float] = None) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += wait_seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+        if connect_seconds is not None:
+            self.connects += 1
+            self.connect_seconds_total += connect_seconds
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that times how long each checkout waits for a connection.
+    
+    Opening a new connection is timed separately, so wait time only
+    counts queueing for a free connection, i.e. pool saturation, and
+    not the connect latency of a checkout that had to open one.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+    
+    def recreate(self):
+        # Keep counters across pool recreation (engine.dispose())
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+    
+    def _create_connection(self):
+        start = time.perf_counter()
+        record = super()._create_connection()
+        record._connect_seconds = time.perf_counter() - start
+        return record
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.timeouts += 1
+            raise
+        elapsed = time.perf_counter() - start
+        # Only set on a record this checkout just created
+        connect_seconds = record.__dict__.pop("_connect_seconds", None)
+        self.stats.record(elapsed - (connect_seconds or 0.0), connect_seconds)
+        return record
+
+
+def get_engine_options() -> Dict[str, Any]:
+    """Engine keyword arguments from settings."""
+    echo = settings.db_echo
+    if echo is None:
+        echo = settings.environment == "development"
+    
+    options: Dict[str, Any] = {
+        "echo": echo,
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if settings.db_pgbouncer:
+        # pgbouncer in transaction mode hands each transaction a different
+        # server connection, so prepared statements cannot be reused and
+        # their names must not collide across clients
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return options
+
+
 # Create async engine
 engine = create_async_engine(
     get_async_database_url(settings.database_url),
-    echo=settings.environment == "development",
-    pool_pre_ping=True,
+    **get_engine_options(),
 )
 
 # Session factory
@@ -44,10 +135,90 @@ async def init_db():
     """Initialize database tables."""
     async with engine.begin() as conn:
         # Import models to register them
-        from models import scan, project, user  # noqa
+        from models import scan, finding, rollup, issue, project, user  # noqa
+        from services.rollups import backfill_daily_rollups, backfill_project_rollups
+        from services.partitions import ensure_partitions, is_plain_table
+        
+        # Databases created before partitioning keep a plain scans table
+        if await is_plain_table(conn, "scans"):
+            await conn.run_sync(create_plain_findings_table)
         
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
+        
+        # create_all skips new columns and indexes on tables that already
+        # exist; add them, except ones left to a migration (see migrations/)
+        await conn.run_sync(add_missing_columns)
+        await conn.run_sync(create_missing_indexes)
+        
+        # Partitioned tables need a partition before the first insert
+        await ensure_partitions(conn)
+        
+        # Seed rollups from scans ingested before rollups existed
+        await backfill_daily_rollups(conn)
+        await backfill_project_rollups(conn)
+
+
+def create_plain_findings_table(sync_conn) -> None:
+    """
+    Create scan_findings unpartitioned, referencing scans(id).
+    
+    For databases whose scans table predates partitioning: its primary
+    key is (id) alone, so the model's foreign key on (id, created_at)
+    cannot be created. Moving both tables to the partitioned layout
+    needs a manual data migration.
+    """
+    metadata = MetaData()
+    Base.metadata.tables["scans"].to_metadata(metadata)
+    findings = Base.metadata.tables["scan_findings"].to_metadata(metadata)
+    findings.dialect_options["postgresql"]["partition_by"] = None
+    for constraint in list(findings.foreign_key_constraints):
+        findings.constraints.discard(constraint)
+        for element in constraint.elements:
+            element.parent.foreign_keys.discard(element)
+            findings.foreign_keys.discard(element)
+    findings.append_constraint(ForeignKeyConstraint([findings.c.scan_id], ["scans.id"], ondelete="CASCADE"))
+    findings.create(sync_conn, checkfirst=True)
+
+
+def add_missing_columns(sync_conn) -> None:
+    """Add nullable model columns that are missing from existing tables."""
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable or "migration" in column.info:
+                continue
+            column_ddl = CreateColumn(column).compile(dialect=sync_conn.dialect)
+            sync_conn.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN IF NOT EXISTS {column_ddl}')
+
+
+def create_missing_indexes(sync_conn) -> None:
+    """Create model indexes that are missing from existing tables."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if "migration" not in index.info:
+                index.create(sync_conn, checkfirst=True)
+
+
+def get_pool_status() -> Dict[str, Any]:
+    """Live pool usage and checkout wait statistics."""
+    pool = engine.pool
+    stats = pool.stats
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.db_max_overflow,
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "wait_seconds_total": round(stats.wait_seconds_total, 6),
+        "wait_seconds_max": round(stats.wait_seconds_max, 6),
+        "wait_seconds_avg": round(stats.wait_seconds_total / stats.checkouts, 6) if stats.checkouts else 0.0,
+        "connects": stats.connects,
+        "connect_seconds_total": round(stats.connect_seconds_total, 6),
+    }
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
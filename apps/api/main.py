@@ -5,13 +5,18 @@ Backend API for the InfraIQ Web Dashboard.
 Handles scan data, projects, licensing, and Stripe webhooks.
 """
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from contextlib import asynccontextmanager
 import logging
 import os
 
 from config import settings
+from services.metrics import (
+    MetricsMiddleware, INGEST_QUEUE_DEPTH, instrument_engine, register_pool_collector, require_metrics_token,
+)
+from services.query_stats import QueryStatsMiddleware, track_engine_queries
 
 # Configure logging
 logging.basicConfig(
@@ -39,9 +44,13 @@ async def lifespan(app: FastAPI):
     if os.getenv("DATABASE_URL"):
         try:
             from database import init_db
+            from services.ingest_queue import ingest_queue
+            from services.partitions import partition_maintenance
             await init_db()
             db_available = True
             logger.info("Database initialized")
+            ingest_queue.start()
+            partition_maintenance.start()
         except Exception as e:
             logger.warning(f"Database initialization failed: {e}")
             logger.warning("API will run without database - some features unavailable")
@@ -52,6 +61,11 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down InfraIQ API...")
+    if db_available:
+        from services.ingest_queue import ingest_queue
+        from services.partitions import partition_maintenance
+        await partition_maintenance.stop()
+        await ingest_queue.stop()
 
 
 # Create FastAPI application
@@ -71,8 +85,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read the query debug headers and cache validators
+    expose_headers=["X-DB-Queries", "X-DB-Time", "ETag"],
 )
 
+# Per-request SQL statement counts, slow request log and X-DB-* headers
+app.add_middleware(QueryStatsMiddleware)
+
+# Request latency and in-flight metrics (outermost, so CORS is timed too)
+app.add_middleware(MetricsMiddleware)
+
 
 # Health check endpoint
 @app.get("/health")
@@ -86,6 +108,22 @@ async def health_check():
     }
 
 
+@app.get("/health/db", dependencies=[Depends(require_metrics_token)])
+async def database_health():
+    """Connection pool usage and checkout wait statistics."""
+    if not db_available:
+        return {"database": "not configured"}
+    
+    from database import get_pool_status
+    return {"database": "connected", "pool": get_pool_status()}
+
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    """Prometheus metrics."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -98,7 +136,15 @@ async def root():
 
 # Only include routers if database is configured
 if os.getenv("DATABASE_URL"):
-    from routers import scans, projects, license, sync, webhooks, dashboard, users, checkout
+    from database import engine, get_pool_status
+    instrument_engine(engine)
+    track_engine_queries(engine)
+    register_pool_collector(get_pool_status)
+    
+    from services.ingest_queue import ingest_queue
+    INGEST_QUEUE_DEPTH.set_function(ingest_queue.depth)
+    
+    from routers import scans, projects, license, sync, webhooks, dashboard, users, checkout, issues, findings
     app.include_router(scans.router, prefix="/api/scans", tags=["scans"])
     app.include_router(projects.router, prefix="/api/projects", tags=["projects"])
     app.include_router(license.router, prefix="/api/license", tags=["license"])
@@ -106,6 +152,8 @@ if os.getenv("DATABASE_URL"):
     app.include_router(dashboard.router, prefix="/api/dashboard", tags=["dashboard"])
     app.include_router(webhooks.router, prefix="/webhooks", tags=["webhooks"])
     app.include_router(users.router, prefix="/api/users", tags=["users"])
+    app.include_router(issues.router, prefix="/api/issues", tags=["issues"])
+    app.include_router(findings.router, prefix="/api/findings", tags=["findings"])
     app.include_router(checkout.router)
 
 
@@ -0,0 +1,8 @@
+"""
+Migrations
+
+Schema changes too heavy for init_db to run at startup, such as ones
+that rewrite a large table. Each is run once per database by an
+operator, from apps/api:
+    python -m migrations.search_vector
+"""
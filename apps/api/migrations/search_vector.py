@@ -0,0 +1,120 @@
+"""
+Search Vector Migration
+
+Adds the stored search_vector column and its GIN index to an existing
+scan_findings table. Fresh databases get both from create_all; init_db
+leaves existing ones to this step because adding a stored generated
+column rewrites the whole table under an ACCESS EXCLUSIVE lock, which
+blocks reads and writes of findings until it finishes.
+
+Run it in a maintenance window, before deploying a version whose
+search reads search_vector:
+    python -m migrations.search_vector
+
+The index is then built with CREATE INDEX CONCURRENTLY, one partition
+at a time, so ingest keeps running while it builds. Rerunning is safe:
+finished steps are skipped and invalid indexes left by an interrupted
+build are rebuilt.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy import text
+from typing import List
+import asyncio
+import logging
+import sys
+
+from database import engine
+from models import ScanFinding
+from services.partitions import is_partitioned
+
+logger = logging.getLogger(__name__)
+
+TABLE = ScanFinding.__tablename__
+COLUMN = ScanFinding.__table__.c.search_vector
+INDEX = "ix_scan_findings_search_vector"
+
+
+async def add_column(conn: AsyncConnection) -> None:
+    """Add search_vector; rewrites the table when the column is missing."""
+    column_ddl = CreateColumn(COLUMN).compile(dialect=conn.dialect)
+    await conn.execute(text(f'ALTER TABLE "{TABLE}" ADD COLUMN IF NOT EXISTS {column_ddl}'))
+
+
+async def index_state(conn: AsyncConnection, name: str):
+    """Whether an index exists and is valid, as (exists, valid)."""
+    result = await conn.execute(
+        text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": name},
+    )
+    valid = result.scalar()
+    return valid is not None, bool(valid)
+
+
+async def build_index(conn: AsyncConnection, name: str, table: str) -> None:
+    """Build a GIN index on search_vector without blocking writes."""
+    exists, valid = await index_state(conn, name)
+    if exists and valid:
+        return
+    if exists:
+        logger.info(f"Rebuilding invalid index {name}")
+        await conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+    logger.info(f"Building {name} on {table}")
+    await conn.execute(text(f'CREATE INDEX CONCURRENTLY "{name}" ON "{table}" USING gin ("{COLUMN.name}")'))
+
+
+async def unindexed_partitions(conn: AsyncConnection) -> List[str]:
+    """Partitions of the table without an index attached to INDEX."""
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table) AND NOT EXISTS ("
+            "SELECT 1 FROM pg_index x JOIN pg_inherits xi ON xi.inhrelid = x.indexrelid "
+            "WHERE x.indrelid = c.oid AND xi.inhparent = to_regclass(:index)) "
+            "ORDER BY c.relname"
+        ),
+        {"table": TABLE, "index": INDEX},
+    )
+    return result.scalars().all()
+
+
+async def create_index(conn: AsyncConnection) -> None:
+    """
+    Create INDEX without holding a lock that blocks writes.
+    
+    A partitioned table cannot be indexed concurrently, so the index is
+    declared on the parent only, then built concurrently on each
+    partition and attached; it becomes valid once every partition has
+    one. Partitions created meanwhile get it from the parent.
+    """
+    if not await is_partitioned(conn, TABLE):
+        await build_index(conn, INDEX, TABLE)
+        return
+    
+    await conn.execute(text(f'CREATE INDEX IF NOT EXISTS "{INDEX}" ON ONLY "{TABLE}" USING gin ("{COLUMN.name}")'))
+    for partition in await unindexed_partitions(conn):
+        name = f"{partition}_search_vector_idx"
+        await build_index(conn, name, partition)
+        await conn.execute(text(f'ALTER INDEX "{INDEX}" ATTACH PARTITION "{name}"'))
+
+
+async def migrate() -> None:
+    async with engine.connect() as conn:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        logger.info(f"Adding {TABLE}.{COLUMN.name}, rewriting the table if it is missing")
+        await add_column(conn)
+        await create_index(conn)
+        _, valid = await index_state(conn, INDEX)
+        logger.info(f"{INDEX} is {'valid' if valid else 'not valid yet, rerun to finish'}")
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    asyncio.run(migrate())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,9 @@ All SQLAlchemy models for the InfraIQ API.
 """
 
 from .scan import Scan, ToolType, ScanStatus
+from .finding import ScanFinding
+from .rollup import ScanDailyRollup, ScanProjectRollup
+from .issue import Issue
 from .project import Project
 from .user import User
 
@@ -12,6 +15,10 @@ __all__ = [
     "Scan",
     "ToolType", 
     "ScanStatus",
+    "ScanFinding",
+    "ScanDailyRollup",
+    "ScanProjectRollup",
+    "Issue",
     "Project",
     "User",
 ]
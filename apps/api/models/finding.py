@@ -0,0 +1,92 @@
+"""
+Finding Model
+
+Represents a single finding from a scan, stored as its own row.
+"""
+
+from sqlalchemy import (
+    Column, Computed, String, Integer, BigInteger, Text, DateTime, ForeignKeyConstraint, Index, func, literal_column,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from database import Base
+
+# Text search configuration; a literal so the index expression is immutable
+SEARCH_CONFIG = literal_column("'english'")
+
+
+def finding_search_vector(issue, resource_type, resource_id, remediation):
+    """
+    Weighted text search document of a finding.
+    
+    Stored in ScanFinding.search_vector, which search queries and the
+    search index use instead of recomputing it.
+    """
+    parts = [
+        func.setweight(func.to_tsvector(SEARCH_CONFIG, column), literal_column(f"'{weight}'"))
+        for column, weight in ((issue, "A"), (resource_type, "B"), (resource_id, "B"), (remediation, "C"))
+    ]
+    vector = parts[0]
+    for part in parts[1:]:
+        vector = vector.op("||", return_type=TSVECTOR)(part)
+    return vector
+
+
+class ScanFinding(Base):
+    """
+    Scan finding model.
+    
+    One row per finding so findings can be filtered and counted
+    in SQL instead of parsing the scan's JSON blob.
+    """
+    __tablename__ = "scan_findings"
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    scan_id = Column(String, nullable=False, index=True)
+    
+    # Copy of the scan's created_at: the monthly partition key, so a
+    # scan and its findings land in the same month
+    scan_created_at = Column(DateTime(timezone=True), primary_key=True, nullable=False)
+    
+    # Order of the finding within the scan payload
+    position = Column(Integer, nullable=False, default=0)
+    
+    # Finding details (finding_id is the CLI-assigned ID)
+    finding_id = Column(String, nullable=False)
+    resource_type = Column(String, nullable=False, index=True)
+    resource_id = Column(String, nullable=False, index=True)
+    issue = Column(Text, nullable=False)
+    severity = Column(String(20), nullable=False, index=True)
+    remediation = Column(Text, nullable=False)
+    
+    # Identity across scans (services.findings.finding_fingerprint)
+    fingerprint = Column(String(64), nullable=False, index=True)
+    
+    # Text search document, computed by PostgreSQL on insert. Stored so
+    # matching and ranking read it instead of re-parsing the text.
+    # Adding it rewrites the table, so existing databases get it and its
+    # index from migrations/search_vector.py rather than init_db.
+    search_vector = Column(
+        TSVECTOR,
+        Computed(finding_search_vector(issue, resource_type, resource_id, remediation), persisted=True),
+        info={"migration": "search_vector"},
+    )
+    
+    __table_args__ = (
+        ForeignKeyConstraint(
+            [scan_id, scan_created_at],
+            ["scans.id", "scans.created_at"],
+            ondelete="CASCADE",
+        ),
+        # Diffs anti-join one scan's fingerprints against another's
+        Index("ix_scan_findings_scan_id_fingerprint", scan_id, fingerprint),
+        # Full-text search
+        Index(
+            "ix_scan_findings_search_vector", search_vector,
+            postgresql_using="gin", info={"migration": "search_vector"},
+        ),
+        {"postgresql_partition_by": "RANGE (scan_created_at)"},
+    )
+    
+    def __repr__(self):
+        return f"<ScanFinding {self.finding_id} ({self.severity})>"
@@ -0,0 +1,62 @@
+"""
+Issue Model
+
+Tracks a finding across scans by its fingerprint.
+"""
+
+from sqlalchemy import Column, String, DateTime, Text, BigInteger, Enum, Index, UniqueConstraint
+
+from database import Base
+from .scan import ToolType
+
+
+class Issue(Base):
+    """
+    Issue model.
+    
+    One row per distinct finding per user. Every scan that reports the
+    finding moves last_seen forward; a completed scan of the same
+    tool/provider/region that no longer reports it sets resolved_at.
+    """
+    __tablename__ = "issues"
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(String, nullable=False)  # Clerk user ID
+    fingerprint = Column(String(64), nullable=False)
+    
+    # Where the issue was found
+    tool = Column(Enum(ToolType), nullable=False)
+    provider = Column(String, nullable=False)
+    region = Column(String, nullable=True)
+    
+    # Finding details (severity follows the latest sighting)
+    resource_type = Column(String, nullable=False)
+    resource_id = Column(String, nullable=False)
+    issue = Column(Text, nullable=False)
+    severity = Column(String(20), nullable=False)
+    
+    # Lifecycle
+    first_seen = Column(DateTime(timezone=True), nullable=False)
+    last_seen = Column(DateTime(timezone=True), nullable=False)
+    resolved_at = Column(DateTime(timezone=True), nullable=True)
+    first_scan_id = Column(String, nullable=False)
+    last_scan_id = Column(String, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "fingerprint", name="uq_issues_user_id_fingerprint"),
+        # Open issues by severity ("open criticals")
+        Index(
+            "ix_issues_user_id_open_severity", user_id, severity,
+            postgresql_where=resolved_at.is_(None),
+        ),
+        # Open issues of a scan target, for resolution at ingest
+        Index(
+            "ix_issues_user_id_open_target", user_id, tool, provider, region,
+            postgresql_where=resolved_at.is_(None),
+        ),
+        # Recently resolved issues and time to resolve
+        Index("ix_issues_user_id_resolved_at", user_id, resolved_at),
+    )
+    
+    def __repr__(self):
+        return f"<Issue {self.fingerprint[:12]} ({self.severity})>"
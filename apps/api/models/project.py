@@ -27,8 +27,9 @@ class Project(Base):
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     
-    # Related scans
-    scans = relationship("Scan", back_populates="project", lazy="selectin")
+    # Related scans; never loaded implicitly, query Scan by project_id
+    # (delete_project detaches scans itself, hence passive_deletes)
+    scans = relationship("Scan", back_populates="project", lazy="raise", passive_deletes=True)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
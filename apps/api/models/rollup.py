@@ -0,0 +1,80 @@
+"""
+Rollup Models
+
+Pre-aggregated scan statistics maintained at ingest time.
+"""
+
+from sqlalchemy import Column, String, Date, DateTime, Integer, BigInteger, Enum, ForeignKey
+from sqlalchemy.sql import func
+
+from database import Base
+from .scan import ToolType, ScanStatus
+
+
+class ScanDailyRollup(Base):
+    """
+    Daily scan rollup.
+    
+    One row per (user, day, tool), updated in the same transaction
+    as the scans it counts so stats never need to read raw scans.
+    """
+    __tablename__ = "scan_daily_rollups"
+    
+    user_id = Column(String, primary_key=True)  # Clerk user ID
+    day = Column(Date, primary_key=True)  # UTC day the scans were ingested
+    tool = Column(Enum(ToolType), primary_key=True)
+    
+    # Scan counts
+    scan_count = Column(Integer, nullable=False, default=0)
+    in_progress = Column(Integer, nullable=False, default=0)
+    
+    # Summary totals
+    resources_scanned = Column(BigInteger, nullable=False, default=0)
+    issues_found = Column(BigInteger, nullable=False, default=0)
+    critical = Column(BigInteger, nullable=False, default=0)
+    high = Column(BigInteger, nullable=False, default=0)
+    medium = Column(BigInteger, nullable=False, default=0)
+    low = Column(BigInteger, nullable=False, default=0)
+    
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<ScanDailyRollup {self.user_id} {self.day} ({self.tool.value})>"
+
+
+class ScanProjectRollup(Base):
+    """
+    Project scan rollup.
+    
+    One row per (project, tool) with totals over the project's scans
+    and the latest scan of that tool, updated in the same transaction
+    as the scans it counts.
+    """
+    __tablename__ = "scan_project_rollups"
+    
+    project_id = Column(String, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    tool = Column(Enum(ToolType), primary_key=True)
+    
+    # Scan counts
+    scan_count = Column(Integer, nullable=False, default=0)
+    in_progress = Column(Integer, nullable=False, default=0)
+    
+    # Summary totals
+    resources_scanned = Column(BigInteger, nullable=False, default=0)
+    issues_found = Column(BigInteger, nullable=False, default=0)
+    critical = Column(BigInteger, nullable=False, default=0)
+    high = Column(BigInteger, nullable=False, default=0)
+    medium = Column(BigInteger, nullable=False, default=0)
+    low = Column(BigInteger, nullable=False, default=0)
+    
+    # Latest scan of this tool in the project
+    latest_scan_id = Column(String, nullable=True)
+    latest_scan_at = Column(DateTime(timezone=True), nullable=True)
+    latest_status = Column(Enum(ScanStatus), nullable=True)
+    
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<ScanProjectRollup {self.project_id} ({self.tool.value})>"
@@ -4,7 +4,7 @@ Scan Model
 Represents a scan result from the InfraIQ CLI.
 """
 
-from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -60,7 +60,8 @@ class Scan(Base):
     #     "low": int
     # }
     
-    # Detailed findings
+    # Legacy detailed findings - new scans store findings as rows
+    # in scan_findings (see models/finding.py)
     findings = Column(JSON, nullable=False, default=list)
     # Expected structure:
     # [
@@ -74,13 +75,32 @@ class Scan(Base):
     #     }
     # ]
     
+    # Key of the archive file holding the findings of an archived scan,
+    # whose rows and legacy blob have been cleared (see services/archive.py)
+    findings_archive_key = Column(String(64), nullable=True)
+    
     # Project association (optional)
     project_id = Column(String, ForeignKey("projects.id"), nullable=True, index=True)
     project = relationship("Project", back_populates="scans")
     
-    # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Timestamps; created_at is the monthly partition key and so part
+    # of the primary key (see services/partitions.py)
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    __table_args__ = (
+        # Newest-first listing and keyset pagination per user
+        Index("ix_scans_user_id_created_at", user_id, created_at.desc(), id.desc()),
+        # Latest scan per tool and tool-filtered listing
+        Index("ix_scans_user_id_tool_created_at", user_id, tool, created_at.desc()),
+        # Archive garbage collection looks up which keys are still referenced
+        Index(
+            "ix_scans_findings_archive_key",
+            findings_archive_key,
+            postgresql_where=findings_archive_key.isnot(None),
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    
     def __repr__(self):
         return f"<Scan {self.id} ({self.tool.value} - {self.status.value})>"
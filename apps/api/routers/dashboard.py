@@ -4,16 +4,18 @@ Dashboard Router
 Aggregated data for the dashboard home page.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta, timezone
 
 from database import get_db
-from models import Scan, ToolType
+from models import Scan, ToolType, ScanDailyRollup, Issue
 from services.auth import get_current_user_id
+from services.rollups import utc_today
+from services.caching import make_etag, conditional_response, user_data_version
 
 router = APIRouter()
 
@@ -50,44 +52,72 @@ class Recommendation(BaseModel):
     action_url: str
 
 
+# =============================================================================
+# Helper Functions
+# =============================================================================
+
+def rollup_total(column):
+    """SQL expression summing a rollup counter, 0 when there are no rows."""
+    return func.coalesce(func.sum(column), 0)
+
+
 # =============================================================================
 # Endpoints
 # =============================================================================
 
 @router.get("/stats", response_model=DashboardStats)
 async def get_dashboard_stats(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user_id),
 ):
     """
     Get aggregated statistics for the dashboard.
     
-    Calculates stats from recent scans.
+    Calculates stats from the daily rollups of the last 7 days.
+    Responses carry an ETag of the user's data version and the day;
+    If-None-Match returns 304 without aggregating.
     """
-    # Get scans from the last week
-    week_ago = datetime.utcnow() - timedelta(days=7)
+    today = utc_today()
+    version = await user_data_version(db, user_id)
+    not_modified = conditional_response(request, response, make_etag("dashboard-stats", user_id, version, today))
+    if not_modified:
+        return not_modified
+    
+    # Rollup days covering the last week, today included
+    week_start = today - timedelta(days=6)
+    week_start_at = datetime.combine(week_start, time.min, tzinfo=timezone.utc)
     
-    query = select(Scan).where(
-        Scan.user_id == user_id,
-        Scan.created_at >= week_ago,
+    # Sum at most 7 days x tools rollup rows instead of reading scans
+    query = select(
+        rollup_total(ScanDailyRollup.scan_count).label("scans"),
+        rollup_total(ScanDailyRollup.resources_scanned).label("resources"),
+        rollup_total(ScanDailyRollup.issues_found).label("issues"),
+        rollup_total(ScanDailyRollup.critical).label("critical"),
+        func.coalesce(
+            func.sum(ScanDailyRollup.in_progress).filter(ScanDailyRollup.tool == ToolType.MIGRATE), 0
+        ).label("active_migrations"),
+    ).where(
+        ScanDailyRollup.user_id == user_id,
+        ScanDailyRollup.day >= week_start,
     )
     result = await db.execute(query)
-    recent_scans = result.scalars().all()
+    stats = result.one()
     
     # Calculate stats
-    total_resources = 0
-    total_issues = 0
-    critical_issues = 0
-    active_migrations = 0
+    total_resources = stats.resources
+    total_issues = stats.issues
+    critical_issues = stats.critical
+    active_migrations = stats.active_migrations
     
-    for scan in recent_scans:
-        summary = scan.summary or {}
-        total_resources += summary.get("resources_scanned", 0)
-        total_issues += summary.get("issues_found", 0)
-        critical_issues += summary.get("critical", 0)
-        
-        if scan.tool == ToolType.MIGRATE and scan.status.value == "in_progress":
-            active_migrations += 1
+    # Issues resolved this week, from the issue lifecycle table
+    issues_resolved = await db.scalar(
+        select(func.count()).select_from(Issue).where(
+            Issue.user_id == user_id,
+            Issue.resolved_at >= week_start_at,
+        )
+    )
     
     # Calculate security score (simple algorithm)
     if total_resources > 0:
@@ -116,8 +146,8 @@ async def get_dashboard_stats(
             ComplianceStatus(framework="SOC2", status="compliant"),
         ],
         active_migrations=active_migrations,
-        scans_this_week=len(recent_scans),
-        issues_resolved=0,  # TODO: Track resolved issues
+        scans_this_week=stats.scans,
+        issues_resolved=issues_resolved,
     )
 
 
@@ -133,19 +163,26 @@ async def get_recommendations(
     """
     recommendations = []
     
-    # Get latest scan of each type
+    # Get latest scan of each type in one query, reading only the summary
+    ranked = select(
+        Scan.id,
+        Scan.tool,
+        Scan.summary["critical"].as_integer().label("critical"),
+        func.row_number().over(
+            partition_by=Scan.tool,
+            order_by=(Scan.created_at.desc(), Scan.id.desc()),
+        ).label("rank"),
+    ).where(Scan.user_id == user_id).subquery()
+    
+    query = select(ranked.c.id, ranked.c.tool, ranked.c.critical).where(ranked.c.rank == 1)
+    result = await db.execute(query)
+    latest_scans = {row.tool: row for row in result}
+    
     for tool in ToolType:
-        query = select(Scan).where(
-            Scan.user_id == user_id,
-            Scan.tool == tool,
-        ).order_by(Scan.created_at.desc()).limit(1)
-        
-        result = await db.execute(query)
-        scan = result.scalar_one_or_none()
+        scan = latest_scans.get(tool)
         
         if scan:
-            summary = scan.summary or {}
-            critical = summary.get("critical", 0)
+            critical = scan.critical or 0
             
             if critical > 0:
                 recommendations.append(Recommendation(
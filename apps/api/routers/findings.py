@@ -0,0 +1,102 @@
+"""
+Findings Router
+
+Search across the findings of all of a user's scans.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+from database import get_db
+from models import ToolType
+from routers.scans import Finding
+from services.auth import get_current_user_id
+from services.findings import row_to_finding, search_findings
+
+router = APIRouter()
+
+
+# =============================================================================
+# Schemas
+# =============================================================================
+
+class FindingSearchResult(BaseModel):
+    """A matching finding with the scan it came from."""
+    scan_id: str
+    tool: str
+    provider: str
+    region: Optional[str]
+    scanned_at: datetime
+    finding: Finding
+    rank: float
+
+
+class FindingSearchResponse(BaseModel):
+    """Paginated search results, best match first."""
+    results: List[FindingSearchResult]
+    limit: int
+    offset: int
+    has_more: bool
+
+
+# =============================================================================
+# Endpoints
+# =============================================================================
+
+@router.get("/search", response_model=FindingSearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=500, description='Search terms, e.g. public s3 bucket or "block public access"'),
+    severity: Optional[List[str]] = Query(None, description="Filter by severity, repeatable"),
+    tool: Optional[str] = Query(None, description="Filter by tool"),
+    since: Optional[datetime] = Query(None, description="Only scans created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only scans created before this time"),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0, le=10000),
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Search findings by issue, remediation, resource ID and resource type.
+    
+    Matches in the issue text rank above resource matches, which rank
+    above remediation matches.
+    """
+    tool_type = None
+    if tool:
+        try:
+            tool_type = ToolType(tool)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid tool: {tool}")
+    
+    rows = await search_findings(
+        db,
+        user_id,
+        q,
+        severities=severity,
+        tool=tool_type,
+        since=since,
+        until=until,
+        limit=limit,
+        offset=offset,
+    )
+    
+    return FindingSearchResponse(
+        results=[
+            FindingSearchResult(
+                scan_id=row.scan_id,
+                tool=row.tool.value,
+                provider=row.provider,
+                region=row.region,
+                scanned_at=row.created_at,
+                finding=Finding(**row_to_finding(row)),
+                rank=row.rank,
+            )
+            for row in rows[:limit]
+        ],
+        limit=limit,
+        offset=offset,
+        has_more=len(rows) > limit,
+    )
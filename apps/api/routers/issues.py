@@ -0,0 +1,159 @@
+"""
+Issues Router
+
+Open and resolved issues tracked across scans.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, extract
+from pydantic import BaseModel
+from typing import Optional, List, Dict
+from datetime import datetime
+
+from database import get_db
+from models import Issue, ToolType
+from services.auth import get_current_user_id
+
+router = APIRouter()
+
+ISSUE_STATUSES = ("open", "resolved")
+
+
+# =============================================================================
+# Schemas
+# =============================================================================
+
+class IssueResponse(BaseModel):
+    """Issue response model."""
+    id: int
+    fingerprint: str
+    tool: str
+    provider: str
+    region: Optional[str]
+    resource_type: str
+    resource_id: str
+    issue: str
+    severity: str
+    first_seen: datetime
+    last_seen: datetime
+    resolved_at: Optional[datetime]
+    first_scan_id: str
+    last_scan_id: str
+
+
+class IssueListResponse(BaseModel):
+    """Paginated issue list response."""
+    issues: List[IssueResponse]
+    limit: int
+    offset: int
+
+
+class IssueStats(BaseModel):
+    """Issue lifecycle statistics."""
+    open_by_severity: Dict[str, int]
+    open_total: int
+    resolved_total: int
+    mean_time_to_resolve_hours: Optional[float]  # None until an issue is resolved
+
+
+# =============================================================================
+# Helper Functions
+# =============================================================================
+
+def issue_to_response(issue: Issue) -> IssueResponse:
+    """Convert an Issue row to its response model."""
+    return IssueResponse(
+        id=issue.id,
+        fingerprint=issue.fingerprint,
+        tool=issue.tool.value,
+        provider=issue.provider,
+        region=issue.region,
+        resource_type=issue.resource_type,
+        resource_id=issue.resource_id,
+        issue=issue.issue,
+        severity=issue.severity,
+        first_seen=issue.first_seen,
+        last_seen=issue.last_seen,
+        resolved_at=issue.resolved_at,
+        first_scan_id=issue.first_scan_id,
+        last_scan_id=issue.last_scan_id,
+    )
+
+
+# =============================================================================
+# Endpoints
+# =============================================================================
+
+@router.get("", response_model=IssueListResponse)
+async def list_issues(
+    status: str = Query("open", description="open or resolved"),
+    severity: Optional[str] = None,
+    tool: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    List issues for the current user.
+    
+    Open issues are ordered by last sighting, resolved ones by
+    resolution time, newest first.
+    """
+    if status not in ISSUE_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {list(ISSUE_STATUSES)}")
+    
+    query = select(Issue).where(Issue.user_id == user_id)
+    if status == "open":
+        query = query.where(Issue.resolved_at.is_(None)).order_by(Issue.last_seen.desc(), Issue.id.desc())
+    else:
+        query = query.where(Issue.resolved_at.isnot(None)).order_by(Issue.resolved_at.desc(), Issue.id.desc())
+    
+    if severity:
+        query = query.where(Issue.severity == severity)
+    
+    if tool:
+        try:
+            tool_type = ToolType(tool)
+            query = query.where(Issue.tool == tool_type)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid tool: {tool}")
+    
+    result = await db.execute(query.offset(offset).limit(limit))
+    issues = result.scalars().all()
+    
+    return IssueListResponse(
+        issues=[issue_to_response(issue) for issue in issues],
+        limit=limit,
+        offset=offset,
+    )
+
+
+@router.get("/stats", response_model=IssueStats)
+async def get_issue_stats(
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Get open issue counts and mean time to resolve."""
+    open_query = (
+        select(Issue.severity, func.count().label("count"))
+        .where(Issue.user_id == user_id, Issue.resolved_at.is_(None))
+        .group_by(Issue.severity)
+    )
+    open_by_severity = {row.severity: row.count for row in await db.execute(open_query)}
+    
+    resolved_query = select(
+        func.count().label("count"),
+        func.avg(extract("epoch", Issue.resolved_at - Issue.first_seen)).label("seconds"),
+    ).where(Issue.user_id == user_id, Issue.resolved_at.isnot(None))
+    resolved = (await db.execute(resolved_query)).one()
+    
+    return IssueStats(
+        open_by_severity=open_by_severity,
+        open_total=sum(open_by_severity.values()),
+        resolved_total=resolved.count,
+        mean_time_to_resolve_hours=(
+            round(float(resolved.seconds) / 3600, 2) if resolved.seconds is not None else None
+        ),
+    )
@@ -6,14 +6,16 @@ CRUD operations for projects.
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Optional, List
+from sqlalchemy import select, update, func
+from typing import Optional, List, Dict, Sequence
 from pydantic import BaseModel
 from datetime import datetime
 
 from database import get_db
-from models import Project
+from models import Project, Scan, ScanProjectRollup
 from services.auth import get_current_user_id
+from services.rollups import SUMMARY_FIELDS
+from services.caching import bump_user_data_version
 
 router = APIRouter()
 
@@ -34,11 +36,47 @@ class UpdateProjectRequest(BaseModel):
     description: Optional[str] = None
 
 
+class ProjectSummary(BaseModel):
+    """Totals over a project's scans."""
+    scan_count: int = 0
+    latest_scan_at: Optional[datetime] = None
+    resources_scanned: int = 0
+    issues_found: int = 0
+    critical: int = 0
+    high: int = 0
+    medium: int = 0
+    low: int = 0
+
+
+class ProjectToolSummary(BaseModel):
+    """Totals and latest scan for one tool in a project."""
+    tool: str
+    scan_count: int
+    in_progress: int
+    resources_scanned: int
+    issues_found: int
+    critical: int
+    high: int
+    medium: int
+    low: int
+    latest_scan_id: Optional[str]
+    latest_scan_at: Optional[datetime]
+    latest_status: Optional[str]
+
+
+class ProjectSecuritySummary(BaseModel):
+    """Project-level security picture across all of its scans."""
+    project_id: str
+    totals: ProjectSummary
+    tools: List[ProjectToolSummary]
+
+
 class ProjectResponse(BaseModel):
     """Project response model."""
     id: str
     name: str
     description: Optional[str]
+    summary: ProjectSummary = ProjectSummary()
     created_at: datetime
     updated_at: Optional[datetime]
     
@@ -46,6 +84,54 @@ class ProjectResponse(BaseModel):
         from_attributes = True
 
 
+# =============================================================================
+# Helper Functions
+# =============================================================================
+
+async def project_summaries(db: AsyncSession, project_ids: Sequence[str]) -> Dict[str, ProjectSummary]:
+    """
+    Summarize the scans of several projects from their rollups.
+    
+    Reads at most one rollup row per project and tool, however many
+    scans the projects have.
+    """
+    if not project_ids:
+        return {}
+    
+    query = (
+        select(
+            ScanProjectRollup.project_id,
+            func.sum(ScanProjectRollup.scan_count).label("scan_count"),
+            func.max(ScanProjectRollup.latest_scan_at).label("latest_scan_at"),
+            *[func.sum(getattr(ScanProjectRollup, field)).label(field) for field in SUMMARY_FIELDS],
+        )
+        .where(ScanProjectRollup.project_id.in_(project_ids))
+        .group_by(ScanProjectRollup.project_id)
+    )
+    result = await db.execute(query)
+    
+    summaries: Dict[str, ProjectSummary] = {}
+    for row in result:
+        summaries[row.project_id] = ProjectSummary(
+            scan_count=row.scan_count,
+            latest_scan_at=row.latest_scan_at,
+            **{field: row._mapping[field] for field in SUMMARY_FIELDS},
+        )
+    return summaries
+
+
+def project_to_response(project: Project, summary: Optional[ProjectSummary] = None) -> ProjectResponse:
+    """Convert a Project to its response model."""
+    return ProjectResponse(
+        id=project.id,
+        name=project.name,
+        description=project.description,
+        summary=summary or ProjectSummary(),
+        created_at=project.created_at,
+        updated_at=project.updated_at,
+    )
+
+
 # =============================================================================
 # Endpoints
 # =============================================================================
@@ -55,12 +141,14 @@ async def list_projects(
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user_id),
 ):
-    """List all projects for the current user."""
+    """List all projects for the current user, with scan summaries."""
     query = select(Project).where(Project.user_id == user_id).order_by(Project.created_at.desc())
     result = await db.execute(query)
     projects = result.scalars().all()
     
-    return [ProjectResponse.model_validate(p) for p in projects]
+    summaries = await project_summaries(db, [p.id for p in projects])
+    
+    return [project_to_response(p, summaries.get(p.id)) for p in projects]
 
 
 @router.post("", response_model=ProjectResponse)
@@ -80,7 +168,7 @@ async def create_project(
     await db.commit()
     await db.refresh(project)
     
-    return ProjectResponse.model_validate(project)
+    return project_to_response(project)
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
@@ -89,7 +177,7 @@ async def get_project(
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user_id),
 ):
-    """Get a single project by ID."""
+    """Get a single project by ID, with its scan summary."""
     query = select(Project).where(Project.id == project_id, Project.user_id == user_id)
     result = await db.execute(query)
     project = result.scalar_one_or_none()
@@ -97,7 +185,62 @@ async def get_project(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    return ProjectResponse.model_validate(project)
+    summaries = await project_summaries(db, [project.id])
+    
+    return project_to_response(project, summaries.get(project.id))
+
+
+@router.get("/{project_id}/summary", response_model=ProjectSecuritySummary)
+async def get_project_summary(
+    project_id: str,
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Get severity totals, resources scanned and the latest scan of each
+    tool across a project's scans.
+    
+    Served from the project rollup, so the cost does not grow with the
+    number of scans.
+    """
+    query = select(Project.id).where(Project.id == project_id, Project.user_id == user_id)
+    if await db.scalar(query) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    query = (
+        select(ScanProjectRollup)
+        .where(ScanProjectRollup.project_id == project_id)
+        .order_by(ScanProjectRollup.tool)
+    )
+    result = await db.execute(query)
+    rollups = result.scalars().all()
+    
+    tools = [
+        ProjectToolSummary(
+            tool=r.tool.value,
+            scan_count=r.scan_count,
+            in_progress=r.in_progress,
+            resources_scanned=r.resources_scanned,
+            issues_found=r.issues_found,
+            critical=r.critical,
+            high=r.high,
+            medium=r.medium,
+            low=r.low,
+            latest_scan_id=r.latest_scan_id,
+            latest_scan_at=r.latest_scan_at,
+            latest_status=r.latest_status.value if r.latest_status else None,
+        )
+        for r in rollups
+    ]
+    
+    latest_times = [r.latest_scan_at for r in rollups if r.latest_scan_at is not None]
+    totals = ProjectSummary(
+        scan_count=sum(r.scan_count for r in rollups),
+        latest_scan_at=max(latest_times) if latest_times else None,
+        **{field: sum(getattr(r, field) for r in rollups) for field in SUMMARY_FIELDS},
+    )
+    
+    return ProjectSecuritySummary(project_id=project_id, totals=totals, tools=tools)
 
 
 @router.put("/{project_id}", response_model=ProjectResponse)
@@ -122,8 +265,9 @@ async def update_project(
     
     await db.commit()
     await db.refresh(project)
+    summaries = await project_summaries(db, [project.id])
     
-    return ProjectResponse.model_validate(project)
+    return project_to_response(project, summaries.get(project.id))
 
 
 @router.delete("/{project_id}")
@@ -140,6 +284,10 @@ async def delete_project(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
+    # Keep the scans, detached from the project, without loading them
+    detached = await db.execute(update(Scan).where(Scan.project_id == project.id).values(project_id=None))
+    if detached.rowcount:
+        await bump_user_data_version(db, user_id)
     await db.delete(project)
     await db.commit()
     
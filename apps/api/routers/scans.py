@@ -4,19 +4,31 @@ Scans Router
 CRUD operations for scan results.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import Optional, List
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.orm import defer
+from typing import Any, Dict, Optional, List, Tuple
 from pydantic import BaseModel
 from datetime import datetime
+import base64
+import binascii
+import orjson
 import uuid
 
 from database import get_db
-from models import Scan, ToolType, ScanStatus
+from models import Project, Scan, ToolType, ScanStatus
 from services.auth import get_current_user_id
+from services.findings import scan_scope, finding_rows, insert_findings, load_findings, load_scan_findings, diff_scans
+from services.issues import issue_rows, record_issues, resolve_issues
+from services.rollups import scan_rollup, scan_day, record_rollups, record_project_rollup, remove_project_rollup
+from services.compression import DecompressingRoute
+from services.export import EXPORT_FORMATS, iter_export
+from services.caching import make_etag, conditional_response, user_data_version
+from services.metrics import INGEST_FINDINGS
 
-router = APIRouter()
+router = APIRouter(route_class=DecompressingRoute)
 
 
 # =============================================================================
@@ -62,7 +74,7 @@ class ScanResponse(BaseModel):
     region: Optional[str]
     status: str
     summary: ScanSummary
-    findings: List[Finding]
+    findings: Optional[List[Finding]] = None  # None when findings were not requested
     project_id: Optional[str]
     created_at: datetime
     updated_at: Optional[datetime]
@@ -71,12 +83,71 @@ class ScanResponse(BaseModel):
         from_attributes = True
 
 
+class ScanDiffResponse(BaseModel):
+    """Differences between two scans' findings."""
+    base_scan_id: str
+    scan_id: str
+    new: List[Finding]
+    resolved: List[Finding]
+    unchanged_count: int
+
+
 class ScanListResponse(BaseModel):
     """Paginated scan list response."""
     scans: List[ScanResponse]
-    total: int
+    total: Optional[int] = None  # Only computed when include_total=true
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
+
+
+# =============================================================================
+# Helper Functions
+# =============================================================================
+
+class ScanJSONResponse(ORJSONResponse):
+    """ORJSONResponse writing UTC datetimes with a Z suffix, as response_model serialization does."""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+
+def scan_to_dict(scan: Scan, findings: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Build a response body in the ScanResponse shape.
+    
+    Findings were validated at ingest, or by load_findings for legacy
+    blobs, and are passed through rather than rebuilt as Finding
+    models; only the small summary is normalized.
+    """
+    return {
+        "id": scan.id,
+        "tool": scan.tool.value,
+        "provider": scan.provider,
+        "region": scan.region,
+        "status": scan.status.value,
+        "summary": ScanSummary(**(scan.summary or {})).model_dump(),
+        "findings": findings,
+        "project_id": scan.project_id,
+        "created_at": scan.created_at,
+        "updated_at": scan.updated_at,
+    }
+
+
+def encode_cursor(scan: Scan) -> str:
+    """Encode a scan's (created_at, id) sort key as an opaque cursor."""
+    raw = f"{scan.created_at.isoformat()}|{scan.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, scan_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), scan_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 # =============================================================================
@@ -93,6 +164,7 @@ async def create_scan(
     Create a new scan result.
     
     Used by the CLI to sync scan results to the dashboard.
+    A project_id must name one of the user's projects.
     """
     # Validate tool type
     try:
@@ -112,6 +184,15 @@ async def create_scan(
             detail=f"Invalid status: {scan_data.status}. Valid statuses: {[s.value for s in ScanStatus]}"
         )
     
+    # The scan and its project rollup may only be written to the user's own project
+    if scan_data.project_id is not None:
+        query = select(Project.id).where(Project.id == scan_data.project_id, Project.user_id == user_id)
+        if await db.scalar(query) is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+    
+    findings = [f.model_dump() for f in scan_data.findings]
+    INGEST_FINDINGS.labels("create_scan").observe(len(findings))
+    
     # Create scan
     scan = Scan(
         id=str(uuid.uuid4()),
@@ -121,33 +202,33 @@ async def create_scan(
         region=scan_data.region,
         status=status,
         summary=scan_data.summary.model_dump(),
-        findings=[f.model_dump() for f in scan_data.findings],
         project_id=scan_data.project_id,
     )
     
     db.add(scan)
+    await db.flush()
+    scope = scan_scope(scan)
+    await insert_findings(db, finding_rows(scan.id, scan.created_at, scope, findings))
+    await record_issues(db, issue_rows(user_id, scan.id, scope, findings))
+    await resolve_issues(db, user_id, scan.id, scope, status)
+    await record_rollups(db, [scan_rollup(user_id, tool_type, status, scan.summary, day=scan_day(scan))])
+    await record_project_rollup(db, scan)
     await db.commit()
-    await db.refresh(scan)
-    
-    return ScanResponse(
-        id=scan.id,
-        tool=scan.tool.value,
-        provider=scan.provider,
-        region=scan.region,
-        status=scan.status.value,
-        summary=ScanSummary(**scan.summary),
-        findings=[Finding(**f) for f in scan.findings],
-        project_id=scan.project_id,
-        created_at=scan.created_at,
-        updated_at=scan.updated_at,
-    )
+    await db.refresh(scan, ["created_at", "updated_at"])
+    
+    return ScanJSONResponse(scan_to_dict(scan, findings), status_code=201)
 
 
 @router.get("", response_model=ScanListResponse)
 async def list_scans(
+    request: Request,
+    response: Response,
     tool: Optional[str] = Query(None, description="Filter by tool"),
+    include: Optional[str] = Query(None, description="Set to 'findings' to include findings"),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Compute the exact total count"),
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user_id),
 ):
@@ -155,7 +236,28 @@ async def list_scans(
     List all scans for the current user.
     
     Supports filtering by tool and pagination.
+    Returns summaries only unless include=findings is passed.
+    The total count is only computed with include_total=true.
+    
+    Prefer cursor pagination: pass next_cursor from the previous
+    page instead of an offset to avoid scanning skipped rows.
+    
+    Responses carry an ETag of the user's data version and the query;
+    If-None-Match returns 304 without listing anything.
     """
+    if include is not None and include != "findings":
+        raise HTTPException(status_code=400, detail=f"Invalid include: {include}. Valid values: ['findings']")
+    include_findings = include == "findings"
+    
+    if cursor and offset:
+        raise HTTPException(status_code=400, detail="Use either cursor or offset, not both")
+    
+    version = await user_data_version(db, user_id)
+    etag = make_etag("scans", user_id, version, sorted(request.query_params.multi_items()))
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    
     # Build query
     query = select(Scan).where(Scan.user_id == user_id)
     
@@ -166,62 +268,149 @@ async def list_scans(
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid tool: {tool}")
     
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
+    # Get total count (opt-in, it grows with the user's history)
+    total = None
+    if include_total:
+        count_query = select(func.count()).select_from(query.subquery())
+        total = await db.scalar(count_query) or 0
     
-    # Get paginated results
-    query = query.order_by(Scan.created_at.desc()).limit(limit).offset(offset)
+    # Keyset pagination on (created_at, id)
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(tuple_(Scan.created_at, Scan.id) < tuple_(cursor_created_at, cursor_id))
+    
+    # Get paginated results, fetching one extra row to detect a next page
+    query = (
+        query.order_by(Scan.created_at.desc(), Scan.id.desc())
+        .limit(limit + 1)
+        .offset(offset)
+    )
+    if not include_findings:
+        # Never fetch the legacy findings blob for summary listings
+        query = query.options(defer(Scan.findings, raiseload=True))
     result = await db.execute(query)
     scans = result.scalars().all()
     
-    return ScanListResponse(
-        scans=[
-            ScanResponse(
-                id=s.id,
-                tool=s.tool.value,
-                provider=s.provider,
-                region=s.region,
-                status=s.status.value,
-                summary=ScanSummary(**s.summary) if s.summary else ScanSummary(),
-                findings=[Finding(**f) for f in (s.findings or [])],
-                project_id=s.project_id,
-                created_at=s.created_at,
-                updated_at=s.updated_at,
-            )
-            for s in scans
-        ],
-        total=total or 0,
-        limit=limit,
-        offset=offset,
+    next_cursor = None
+    if len(scans) > limit:
+        scans = scans[:limit]
+        next_cursor = encode_cursor(scans[-1])
+    
+    findings = await load_findings(db, scans) if include_findings else {}
+    
+    return ScanJSONResponse(
+        {
+            "scans": [scan_to_dict(s, findings.get(s.id)) for s in scans],
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor,
+        },
+        headers=dict(response.headers),
+    )
+
+
+@router.get("/export")
+async def export_scans(
+    format: str = Query("ndjson", description="Export format: ndjson or csv"),
+    tool: Optional[str] = Query(None, description="Filter by tool"),
+    since: Optional[datetime] = Query(None, description="Only scans created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only scans created before this time"),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Export all scans and findings for the current user.
+    
+    Streams NDJSON (one scan per line, findings inline) or CSV
+    (one row per finding) without paging or counting.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format: {format}. Valid formats: {list(EXPORT_FORMATS)}",
+        )
+    
+    tool_type = None
+    if tool:
+        try:
+            tool_type = ToolType(tool)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid tool: {tool}")
+    
+    return StreamingResponse(
+        iter_export(user_id, format, tool=tool_type, since=since, until=until),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="scans.{format}"'},
     )
 
 
 @router.get("/{scan_id}", response_model=ScanResponse)
 async def get_scan(
     scan_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user_id),
 ):
-    """Get a single scan by ID."""
-    query = select(Scan).where(Scan.id == scan_id, Scan.user_id == user_id)
+    """
+    Get a single scan by ID.
+    
+    Responses carry an ETag of the scan's ID and last update;
+    If-None-Match returns 304 before findings are loaded.
+    """
+    query = (
+        select(Scan)
+        .where(Scan.id == scan_id, Scan.user_id == user_id)
+        .options(defer(Scan.findings))
+    )
     result = await db.execute(query)
     scan = result.scalar_one_or_none()
     
     if not scan:
         raise HTTPException(status_code=404, detail="Scan not found")
     
-    return ScanResponse(
-        id=scan.id,
-        tool=scan.tool.value,
-        provider=scan.provider,
-        region=scan.region,
-        status=scan.status.value,
-        summary=ScanSummary(**scan.summary) if scan.summary else ScanSummary(),
-        findings=[Finding(**f) for f in (scan.findings or [])],
-        project_id=scan.project_id,
-        created_at=scan.created_at,
-        updated_at=scan.updated_at,
+    etag = make_etag("scan", scan.id, scan.updated_at or scan.created_at)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    await db.refresh(scan, ["findings"])
+    findings = await load_scan_findings(db, scan)
+    
+    return ScanJSONResponse(scan_to_dict(scan, findings), headers=dict(response.headers))
+
+
+@router.get("/{scan_id}/diff", response_model=ScanDiffResponse)
+async def diff_scan(
+    scan_id: str,
+    base: str = Query(..., description="ID of the earlier scan to compare against"),
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Compare a scan with an earlier run of the same tool.
+    
+    Findings are matched by fingerprint (scan target, resource and
+    issue). Returns findings that are new in this scan, findings from
+    the base scan that are gone, and how many are unchanged.
+    """
+    query = select(Scan.id, Scan.tool).where(Scan.id.in_([scan_id, base]), Scan.user_id == user_id)
+    result = await db.execute(query)
+    tools = {row.id: row.tool for row in result}
+    
+    if scan_id not in tools or base not in tools:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    if tools[scan_id] != tools[base]:
+        raise HTTPException(status_code=400, detail="Scans must be from the same tool")
+    
+    new, resolved, unchanged_count = await diff_scans(db, base_scan_id=base, head_scan_id=scan_id)
+    
+    return ScanDiffResponse(
+        base_scan_id=base,
+        scan_id=scan_id,
+        new=[Finding(**f) for f in new],
+        resolved=[Finding(**f) for f in resolved],
+        unchanged_count=unchanged_count,
     )
 
 
@@ -232,13 +421,21 @@ async def delete_scan(
     user_id: str = Depends(get_current_user_id),
 ):
     """Delete a scan."""
-    query = select(Scan).where(Scan.id == scan_id, Scan.user_id == user_id)
+    query = (
+        select(Scan)
+        .where(Scan.id == scan_id, Scan.user_id == user_id)
+        .options(defer(Scan.findings, raiseload=True))
+    )
     result = await db.execute(query)
     scan = result.scalar_one_or_none()
     
     if not scan:
         raise HTTPException(status_code=404, detail="Scan not found")
     
+    await record_rollups(db, [
+        scan_rollup(user_id, scan.tool, scan.status, scan.summary or {}, day=scan_day(scan), sign=-1),
+    ])
+    await remove_project_rollup(db, scan)
     await db.delete(scan)
     await db.commit()
     
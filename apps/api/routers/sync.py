@@ -5,16 +5,33 @@ Handles scan data sync from the CLI.
 This is the endpoint that receives data when users run `infraiq ... --sync`.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
-from typing import Optional, List
+from sqlalchemy import select
+from pydantic import BaseModel, ValidationError
+from typing import Optional, List, Any, Dict, Tuple
 from datetime import datetime
+import uuid
 
 from database import get_db
 from models import Scan, ToolType, ScanStatus
+from services.findings import scan_scope, finding_rows, insert_findings
+from services.issues import issue_rows, record_issues, resolve_issues
+from services.rollups import scan_rollup, scan_day, record_rollups
+from services.ndjson import iter_lines, NDJSONError
+from services.compression import DecompressingRoute
+from services.metrics import INGEST_FINDINGS
+from services.ingest import NewScan, write_scans
+from services.ingest_queue import ingest_queue, IngestQueueFull, COMPLETED
+from config import settings
 
-router = APIRouter()
+router = APIRouter(route_class=DecompressingRoute)
+
+# Upper bound on scans accepted by a single batch sync request
+MAX_BATCH_SIZE = 500
+
+# Findings buffered per INSERT during a streaming sync
+STREAM_CHUNK_SIZE = 1000
 
 
 # =============================================================================
@@ -41,21 +58,29 @@ class SyncSummary(BaseModel):
     low: int = 0
 
 
-class SyncRequest(BaseModel):
+class SyncStreamHeader(BaseModel):
     """
-    Sync request from CLI.
+    Scan metadata sent by the CLI.
     
-    This is the payload sent by `infraiq ... --sync`.
+    This is the first line of a streaming NDJSON sync body.
     """
     tool: str
     provider: str
     region: Optional[str] = None
     status: str = "completed"
     summary: SyncSummary
-    findings: List[SyncFinding] = []
     timestamp: Optional[datetime] = None
 
 
+class SyncRequest(SyncStreamHeader):
+    """
+    Sync request from CLI.
+    
+    This is the payload sent by `infraiq ... --sync`.
+    """
+    findings: List[SyncFinding] = []
+
+
 class SyncResponse(BaseModel):
     """Sync response."""
     scan_id: str
@@ -63,22 +88,52 @@ class SyncResponse(BaseModel):
     dashboard_url: str
 
 
-# =============================================================================
-# Endpoints
-# =============================================================================
+class SyncAcceptedResponse(BaseModel):
+    """Response for a scan accepted into the async ingest queue."""
+    scan_id: str
+    status: str
+    status_url: str
+    dashboard_url: str
 
-@router.post("", response_model=SyncResponse)
-async def sync_scan(
-    request: SyncRequest,
-    authorization: str = Header(..., description="Bearer token with license key"),
-    db: AsyncSession = Depends(get_db),
-):
+
+class SyncJobStatus(BaseModel):
+    """Progress of an async sync: queued, processing, completed or failed."""
+    scan_id: str
+    status: str
+    error: Optional[str] = None
+
+
+class SyncBatchRequest(BaseModel):
     """
-    Receive scan data from the CLI.
+    Batch sync request from CLI.
     
-    The CLI sends data here when the --sync flag is used.
-    Authentication is via the license key in the Authorization header.
+    Items are validated one by one so a single malformed scan
+    does not reject the rest of the batch.
     """
+    scans: List[Dict[str, Any]]
+
+
+class SyncBatchItemResult(BaseModel):
+    """Result for a single scan in a batch sync."""
+    index: int
+    scan_id: Optional[str] = None
+    dashboard_url: Optional[str] = None
+    error: Optional[str] = None
+
+
+class SyncBatchResponse(BaseModel):
+    """Batch sync response."""
+    results: List[SyncBatchItemResult]
+    synced: int
+    failed: int
+
+
+# =============================================================================
+# Helper Functions
+# =============================================================================
+
+def get_license_user_id(authorization: str) -> str:
+    """Resolve the user ID from the license key in the Authorization header."""
     # Extract license key from Authorization header
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid authorization header")
@@ -88,20 +143,93 @@ async def sync_scan(
     # TODO: Validate license key and get user_id
     # For now, we'll use the license key as a user identifier
     # In production, this should validate against the license server
-    user_id = f"license:{license_key[:16]}"  # Temporary: use part of key as user ID
+    return f"license:{license_key[:16]}"  # Temporary: use part of key as user ID
+
+
+def resolve_tool_and_status(request: SyncStreamHeader) -> Tuple[ToolType, ScanStatus]:
+    """
+    Validate the tool and status of a sync payload.
     
-    # Validate tool type
+    Raises ValueError for an unknown tool.
+    Unknown statuses fall back to completed.
+    """
     try:
         tool_type = ToolType(request.tool)
     except ValueError:
-        raise HTTPException(status_code=400, detail=f"Invalid tool: {request.tool}")
+        raise ValueError(f"Invalid tool: {request.tool}")
     
-    # Validate status
     try:
         status = ScanStatus(request.status)
     except ValueError:
         status = ScanStatus.COMPLETED
     
+    return tool_type, status
+
+
+def new_scan(
+    scan_id: str,
+    user_id: str,
+    request: SyncRequest,
+    tool_type: ToolType,
+    status: ScanStatus,
+    findings: List[Dict[str, Any]],
+) -> NewScan:
+    """Build the NewScan written for a validated sync payload."""
+    return NewScan(
+        scan_id=scan_id,
+        user_id=user_id,
+        tool=tool_type,
+        status=status,
+        provider=request.provider,
+        region=request.region,
+        summary=request.summary.model_dump(),
+        findings=findings,
+    )
+
+
+def dashboard_url_for(tool: str, scan_id: str) -> str:
+    """Build the dashboard URL for a synced scan."""
+    return f"https://app.autonops.io/{tool}/{scan_id}"
+
+
+async def write_stream_chunk(
+    db: AsyncSession,
+    scan: Scan,
+    chunk: List[Dict[str, Any]],
+    position: int,
+) -> None:
+    """Write one chunk of streamed findings as rows."""
+    scope = scan_scope(scan)
+    await insert_findings(db, finding_rows(scan.id, scan.created_at, scope, chunk, start=position))
+    await record_issues(db, issue_rows(scan.user_id, scan.id, scope, chunk))
+
+
+# =============================================================================
+# Endpoints
+# =============================================================================
+
+@router.post("", response_model=SyncResponse)
+async def sync_scan(
+    request: SyncRequest,
+    authorization: str = Header(..., description="Bearer token with license key"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Receive scan data from the CLI.
+    
+    The CLI sends data here when the --sync flag is used.
+    Authentication is via the license key in the Authorization header.
+    """
+    user_id = get_license_user_id(authorization)
+    
+    try:
+        tool_type, status = resolve_tool_and_status(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    findings = [f.model_dump() for f in request.findings]
+    INGEST_FINDINGS.labels("sync").observe(len(findings))
+    
     # Create scan record
     scan = Scan(
         user_id=user_id,
@@ -110,20 +238,224 @@ async def sync_scan(
         region=request.region,
         status=status,
         summary=request.summary.model_dump(),
-        findings=[f.model_dump() for f in request.findings],
     )
     
     db.add(scan)
+    await db.flush()
+    scope = scan_scope(scan)
+    await insert_findings(db, finding_rows(scan.id, scan.created_at, scope, findings))
+    await record_issues(db, issue_rows(user_id, scan.id, scope, findings))
+    await resolve_issues(db, user_id, scan.id, scope, status)
+    await record_rollups(db, [scan_rollup(user_id, tool_type, status, scan.summary, day=scan_day(scan))])
     await db.commit()
     await db.refresh(scan)
     
     return SyncResponse(
         scan_id=scan.id,
         message="Scan synced successfully",
-        dashboard_url=f"https://app.autonops.io/{request.tool}/{scan.id}",
+        dashboard_url=dashboard_url_for(request.tool, scan.id),
     )
 
 
+@router.post("/batch", response_model=SyncBatchResponse)
+async def sync_scan_batch(
+    request: SyncBatchRequest,
+    authorization: str = Header(..., description="Bearer token with license key"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Receive many scans from the CLI in one request.
+    
+    Valid scans are written with a single multi-row insert in one
+    transaction. Invalid scans are reported per item and skipped.
+    """
+    user_id = get_license_user_id(authorization)
+    
+    if len(request.scans) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.scans)} scans (max {MAX_BATCH_SIZE})",
+        )
+    
+    results: List[SyncBatchItemResult] = []
+    scans: List[NewScan] = []
+    
+    for index, payload in enumerate(request.scans):
+        try:
+            item = SyncRequest.model_validate(payload)
+            tool_type, status = resolve_tool_and_status(item)
+        except ValidationError as e:
+            error = e.errors()[0]
+            location = ".".join(str(part) for part in error["loc"])
+            results.append(SyncBatchItemResult(index=index, error=f"{location}: {error['msg']}"))
+            continue
+        except ValueError as e:
+            results.append(SyncBatchItemResult(index=index, error=str(e)))
+            continue
+        
+        scan_id = str(uuid.uuid4())
+        item_findings = [f.model_dump() for f in item.findings]
+        INGEST_FINDINGS.labels("sync_batch").observe(len(item_findings))
+        scans.append(new_scan(scan_id, user_id, item, tool_type, status, item_findings))
+        results.append(SyncBatchItemResult(
+            index=index,
+            scan_id=scan_id,
+            dashboard_url=dashboard_url_for(item.tool, scan_id),
+        ))
+    
+    # Multi-row INSERTs for every valid scan and its findings, one transaction
+    if scans:
+        await write_scans(db, scans)
+        await db.commit()
+    
+    return SyncBatchResponse(
+        results=results,
+        synced=len(scans),
+        failed=len(results) - len(scans),
+    )
+
+
+@router.post("/stream", response_model=SyncResponse)
+async def sync_scan_stream(
+    request: Request,
+    authorization: str = Header(..., description="Bearer token with license key"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Receive a large scan from the CLI as NDJSON.
+    
+    The first line is the scan header (tool, provider, summary, ...),
+    every following line is one finding. Findings are parsed as they
+    arrive and written in chunks, so memory does not grow with scan size.
+    """
+    user_id = get_license_user_id(authorization)
+    
+    scan = None
+    chunk: List[Dict[str, Any]] = []
+    position = 0
+    line_number = 0
+    
+    try:
+        async for line in iter_lines(request.stream()):
+            line_number += 1
+            
+            # First line: scan header
+            if scan is None:
+                header = SyncStreamHeader.model_validate_json(line)
+                try:
+                    tool_type, status = resolve_tool_and_status(header)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                
+                scan = Scan(
+                    user_id=user_id,
+                    tool=tool_type,
+                    provider=header.provider,
+                    region=header.region,
+                    status=status,
+                    summary=header.summary.model_dump(),
+                )
+                db.add(scan)
+                await db.flush()
+                continue
+            
+            # Remaining lines: findings
+            chunk.append(SyncFinding.model_validate_json(line).model_dump())
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                await write_stream_chunk(db, scan, chunk, position)
+                position += len(chunk)
+                chunk = []
+    except ValidationError as e:
+        error = e.errors()[0]
+        location = ".".join(str(part) for part in error["loc"])
+        raise HTTPException(status_code=422, detail=f"Line {line_number}: {location}: {error['msg']}")
+    except NDJSONError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    if scan is None:
+        raise HTTPException(status_code=400, detail="Empty sync body: expected a header line")
+    
+    await write_stream_chunk(db, scan, chunk, position)
+    INGEST_FINDINGS.labels("sync_stream").observe(position + len(chunk))
+    await resolve_issues(db, user_id, scan.id, scan_scope(scan), scan.status)
+    await record_rollups(db, [scan_rollup(user_id, scan.tool, scan.status, scan.summary, day=scan_day(scan))])
+    await db.commit()
+    
+    return SyncResponse(
+        scan_id=scan.id,
+        message="Scan synced successfully",
+        dashboard_url=dashboard_url_for(scan.tool.value, scan.id),
+    )
+
+
+@router.post("/async", response_model=SyncAcceptedResponse, status_code=202)
+async def sync_scan_async(
+    request: SyncRequest,
+    authorization: str = Header(..., description="Bearer token with license key"),
+):
+    """
+    Accept scan data from the CLI and write it in the background.
+    
+    Returns 202 with the scan ID as soon as the scan is queued; poll
+    status_url until it reports completed. When the queue is full, by
+    scan count or estimated size, the request is rejected with 503 and
+    a Retry-After header.
+    """
+    user_id = get_license_user_id(authorization)
+    
+    try:
+        tool_type, status = resolve_tool_and_status(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    scan_id = str(uuid.uuid4())
+    findings = [f.model_dump() for f in request.findings]
+    INGEST_FINDINGS.labels("sync_async").observe(len(findings))
+    
+    try:
+        ingest_queue.submit(new_scan(scan_id, user_id, request, tool_type, status, findings))
+    except IngestQueueFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(settings.ingest_retry_after_seconds)},
+        )
+    
+    return SyncAcceptedResponse(
+        scan_id=scan_id,
+        status="queued",
+        status_url=f"/api/sync/async/{scan_id}",
+        dashboard_url=dashboard_url_for(request.tool, scan_id),
+    )
+
+
+@router.get("/async/{scan_id}", response_model=SyncJobStatus)
+async def sync_async_status(
+    scan_id: str,
+    authorization: str = Header(..., description="Bearer token with license key"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Check the progress of a scan sent to POST /api/sync/async.
+    
+    Queued, processing and failed states are kept by the process that
+    accepted the scan; other processes report completed once the scan
+    is written and 404 until then.
+    """
+    user_id = get_license_user_id(authorization)
+    
+    job = ingest_queue.status(scan_id, user_id)
+    if job is not None:
+        state, error = job
+        return SyncJobStatus(scan_id=scan_id, status=state, error=error)
+    
+    # Jobs drop out of the in-memory status window; the scan row remains
+    written = await db.scalar(select(Scan.id).where(Scan.id == scan_id, Scan.user_id == user_id))
+    if written is None:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return SyncJobStatus(scan_id=scan_id, status=COMPLETED)
+
+
 @router.get("/status")
 async def sync_status():
     """
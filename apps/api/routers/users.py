@@ -7,14 +7,16 @@ Called by dashboard after Clerk authentication.
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime, timedelta, timezone
 import secrets
 
 from database import get_db
-from models import User, Scan
+from models import User, ScanDailyRollup
+from services.auth import invalidate_api_key
+from services.rollups import utc_today
 
 router = APIRouter()
 
@@ -107,6 +109,9 @@ async def upsert_current_user(
         db.add(user)
         await db.commit()
         await db.refresh(user)
+        
+        # Drop any cached failed lookup for the new key
+        invalidate_api_key(api_key=user.api_key)
     
     return UserMeResponse(
         id=str(user.id),
@@ -163,31 +168,17 @@ async def get_user_stats(
     
     Returns scan counts for today, this month, and all time.
     """
-    now = datetime.now(timezone.utc)
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    today = utc_today()
+    month_start = today.replace(day=1)
     
-    # Count scans today
-    today_query = select(func.count(Scan.id)).where(
-        and_(
-            Scan.user_id == clerk_id,
-            Scan.created_at >= today_start
-        )
-    )
-    scans_today = await db.scalar(today_query) or 0
-    
-    # Count scans this month
-    month_query = select(func.count(Scan.id)).where(
-        and_(
-            Scan.user_id == clerk_id,
-            Scan.created_at >= month_start
-        )
-    )
-    scans_this_month = await db.scalar(month_query) or 0
-    
-    # Count total scans
-    total_query = select(func.count(Scan.id)).where(Scan.user_id == clerk_id)
-    scans_total = await db.scalar(total_query) or 0
+    # Count scans from the daily rollups: O(days), not O(scans)
+    query = select(
+        func.coalesce(func.sum(ScanDailyRollup.scan_count).filter(ScanDailyRollup.day == today), 0),
+        func.coalesce(func.sum(ScanDailyRollup.scan_count).filter(ScanDailyRollup.day >= month_start), 0),
+        func.coalesce(func.sum(ScanDailyRollup.scan_count), 0),
+    ).where(ScanDailyRollup.user_id == clerk_id)
+    result = await db.execute(query)
+    scans_today, scans_this_month, scans_total = result.one()
     
     return UserStatsResponse(
         scans_today=scans_today,
@@ -14,6 +14,7 @@ import logging
 from config import settings
 from database import get_db
 from models import User
+from services.auth import invalidate_api_key
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -99,6 +100,9 @@ async def clerk_webhook(
             await db.delete(user)
             await db.commit()
             logger.info(f"Deleted user: {data.get('id')}")
+        
+        # Stop accepting the deleted user's cached API key
+        invalidate_api_key(clerk_id=data.get("id"))
     
     return {"received": True}
 
@@ -4,8 +4,9 @@ Services
 Business logic and external integrations.
 """
 
-from .auth import get_current_user_id
+from .auth import get_current_user_id, invalidate_api_key
 
 __all__ = [
     "get_current_user_id",
+    "invalidate_api_key",
 ]
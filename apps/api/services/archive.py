@@ -0,0 +1,171 @@
+"""
+Archive Service
+
+Stores findings of old scans outside PostgreSQL as compressed,
+content-addressed files and reads them back on demand.
+
+Each archived findings list is written as gzip JSON named by the
+SHA-256 of its JSON, so identical lists share one file and writing
+the same list twice only refreshes its mtime. Scans point to their
+file through Scan.findings_archive_key (see services.findings.archive_scans).
+Files no scan references any more are deleted by the maintenance task
+(see services.partitions.collect_archive_garbage).
+
+Reads go through a small in-process LRU cache of the decompressed
+JSON, since a few archived scans (baselines for diffs, recently shared
+links) are read often.
+"""
+
+from collections import OrderedDict
+from fastapi import HTTPException, status
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Suffix of archive file names, after the key
+ARCHIVE_SUFFIX = ".json.gz"
+
+
+class LocalArchiveStore:
+    """Archive files in a local directory, fanned out by key prefix."""
+    
+    def __init__(self, root: str):
+        self.root = Path(root)
+    
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}{ARCHIVE_SUFFIX}"
+    
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Write a file unless it exists; readers never see a partial file.
+        
+        An existing file's mtime is refreshed, so garbage collection
+        treats it as just written.
+        """
+        path = self._path(key)
+        if path.exists():
+            path.touch()
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as tmp:
+            tmp.write(data)
+        os.replace(tmp.name, path)
+    
+    def get(self, key: str) -> bytes:
+        """Read a file; raises FileNotFoundError for an unknown key."""
+        return self._path(key).read_bytes()
+    
+    def list_keys(self, written_before: float) -> List[str]:
+        """Keys of the files last written before a timestamp."""
+        return [
+            path.name[:-len(ARCHIVE_SUFFIX)]
+            for path in self.root.glob(f"*/*{ARCHIVE_SUFFIX}")
+            if path.stat().st_mtime < written_before
+        ]
+    
+    def delete(self, key: str) -> None:
+        """Delete a file if it exists."""
+        self._path(key).unlink(missing_ok=True)
+
+
+# settings.archive_backend -> store class taking settings.archive_dir
+ARCHIVE_BACKENDS = {
+    "local": LocalArchiveStore,
+}
+
+
+def get_archive_store() -> LocalArchiveStore:
+    """The configured archive store."""
+    backend = ARCHIVE_BACKENDS.get(settings.archive_backend)
+    if backend is None:
+        raise ValueError(f"Unknown archive backend: {settings.archive_backend}")
+    return backend(settings.archive_dir)
+
+
+class FindingsCache:
+    """
+    LRU cache of archived findings JSON by archive key, bounded by total size.
+    
+    Entries are immutable bytes, so readers parse their own copy and
+    cannot change what later readers get.
+    """
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+    
+    def get(self, key: str) -> Optional[bytes]:
+        encoded = self._entries.get(key)
+        if encoded is not None:
+            self._entries.move_to_end(key)
+        return encoded
+    
+    def set(self, key: str, encoded: bytes) -> None:
+        if len(encoded) > self.max_bytes:
+            return
+        self._bytes += len(encoded) - len(self._entries.get(key, b""))
+        self._entries[key] = encoded
+        self._entries.move_to_end(key)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+
+# Process-wide cache of decompressed archive JSON
+findings_cache = FindingsCache(settings.archive_cache_bytes)
+
+
+def archive_missing(key: str) -> HTTPException:
+    """503 for a scan whose archive file cannot be found."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"Archived findings are unavailable (archive {key} is missing)",
+    )
+
+
+async def write_archived_findings(findings: List[Dict[str, Any]]) -> str:
+    """Archive a findings list and return its key."""
+    encoded = json.dumps(findings, separators=(",", ":")).encode()
+    key = hashlib.sha256(encoded).hexdigest()
+    data = gzip.compress(encoded, mtime=0)
+    await asyncio.to_thread(get_archive_store().put, key, data)
+    return key
+
+
+def read_archive_json(key: str) -> bytes:
+    """Read and decompress an archive file."""
+    return gzip.decompress(get_archive_store().get(key))
+
+
+async def read_archived_findings(key: str) -> List[Dict[str, Any]]:
+    """
+    Rehydrate an archived findings list, through the LRU cache.
+    
+    Reading, decompressing and parsing run in a worker thread. Every
+    call parses its own list, so callers may modify it. A missing
+    archive file raises archive_missing.
+    """
+    encoded = findings_cache.get(key)
+    if encoded is None:
+        try:
+            encoded = await asyncio.to_thread(read_archive_json, key)
+        except FileNotFoundError:
+            logger.error(f"Archive file missing: {key}")
+            raise archive_missing(key)
+        findings_cache.set(key, encoded)
+    return await asyncio.to_thread(json.loads, encoded)
@@ -8,8 +8,11 @@ from fastapi import HTTPException, Header, Depends
 from fastapi.security import APIKeyHeader
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import Optional
+from typing import Optional, Tuple
+from collections import OrderedDict
+import hashlib
 import logging
+import time
 
 from config import settings
 from database import get_db
@@ -20,6 +23,94 @@ logger = logging.getLogger(__name__)
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
+class APIKeyCache:
+    """
+    Bounded TTL/LRU cache from API key to Clerk user ID.
+    
+    Keys are stored as SHA-256 hashes so raw API keys never sit in
+    memory longer than the request. A cached None means the key was
+    not found and is kept for the shorter negative TTL.
+    
+    The cache is per process: invalidate() only affects the worker it
+    runs in, so the TTL bounds how long other workers keep accepting a
+    regenerated or deleted key.
+    """
+    
+    def __init__(self, max_size: int, ttl: float, negative_ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()
+    
+    @staticmethod
+    def _hash(api_key: str) -> str:
+        return hashlib.sha256(api_key.encode()).hexdigest()
+    
+    def get(self, api_key: str) -> Tuple[bool, Optional[str]]:
+        """Return (hit, clerk_id) for an API key."""
+        key = self._hash(api_key)
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        
+        clerk_id, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return False, None
+        
+        self._entries.move_to_end(key)
+        return True, clerk_id
+    
+    def set(self, api_key: str, clerk_id: Optional[str]) -> None:
+        """Cache a lookup result; None caches a failed lookup."""
+        if self.max_size <= 0:
+            return
+        
+        ttl = self.ttl if clerk_id is not None else self.negative_ttl
+        key = self._hash(api_key)
+        self._entries[key] = (clerk_id, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, api_key: str) -> None:
+        """Drop the entry for an API key."""
+        self._entries.pop(self._hash(api_key), None)
+    
+    def invalidate_user(self, clerk_id: str) -> None:
+        """Drop every entry resolving to a user."""
+        stale = [key for key, (cached_id, _) in self._entries.items() if cached_id == clerk_id]
+        for key in stale:
+            del self._entries[key]
+    
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+
+# Process-wide API key cache
+api_key_cache = APIKeyCache(
+    max_size=settings.auth_cache_size,
+    ttl=settings.auth_cache_ttl_seconds,
+    negative_ttl=settings.auth_cache_negative_ttl_seconds,
+)
+
+
+def invalidate_api_key(api_key: Optional[str] = None, clerk_id: Optional[str] = None) -> None:
+    """
+    Invalidate cached authentication for a key or user.
+    
+    Call when an API key is regenerated or a user is deleted. Other
+    workers drop their entries when settings.auth_cache_ttl_seconds
+    runs out.
+    """
+    if api_key:
+        api_key_cache.invalidate(api_key)
+    if clerk_id:
+        api_key_cache.invalidate_user(clerk_id)
+
+
 async def get_current_user_id(
     authorization: Optional[str] = Header(None),
     x_api_key: Optional[str] = Depends(api_key_header),
@@ -44,13 +135,15 @@ async def get_current_user_id(
         
         # Check if it's a user's personal API key
         if x_api_key.startswith("iq_"):
-            query = select(User).where(User.api_key == x_api_key)
-            result = await db.execute(query)
-            user = result.scalar_one_or_none()
+            hit, clerk_id = api_key_cache.get(x_api_key)
+            if not hit:
+                query = select(User.clerk_id).where(User.api_key == x_api_key)
+                clerk_id = await db.scalar(query)
+                api_key_cache.set(x_api_key, clerk_id)
             
-            if user:
-                logger.debug(f"Authenticated user {user.clerk_id} via API key")
-                return user.clerk_id
+            if clerk_id:
+                logger.debug(f"Authenticated user {clerk_id} via API key")
+                return clerk_id
             else:
                 raise HTTPException(
                     status_code=401,
@@ -0,0 +1,89 @@
+"""
+Caching Service
+
+Conditional GET support for polled read endpoints.
+
+Endpoints compute a strong ETag from cheap version data (row IDs and
+timestamps, or a per-user data version) before loading anything
+expensive, and answer a matching If-None-Match with 304.
+"""
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func
+from typing import Any, Optional
+import hashlib
+
+from models import ScanDailyRollup
+
+# Clients may cache but must revalidate every time
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag from the values a response depends on."""
+    raw = "\x1f".join("" if part is None else str(part) for part in parts)
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+    
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match,
+    so a W/ prefix added by a proxy still matches.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Attach an ETag to the response, or return a 304 if the client has it.
+    
+    Endpoints return the 304 as-is and skip building the body.
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+async def user_data_version(db: AsyncSession, user_id: str) -> str:
+    """
+    Version of a user's scan data.
+    
+    Every scan create and delete upserts the user's daily rollups,
+    so their scan count and last update time change with any write;
+    other scan writes call bump_user_data_version.
+    """
+    query = select(
+        func.coalesce(func.sum(ScanDailyRollup.scan_count), 0).label("scans"),
+        func.max(ScanDailyRollup.updated_at).label("updated_at"),
+    ).where(ScanDailyRollup.user_id == user_id)
+    version = (await db.execute(query)).one()
+    return f"{version.scans}:{version.updated_at.isoformat() if version.updated_at else ''}"
+
+
+async def bump_user_data_version(db: AsyncSession, user_id: str) -> None:
+    """
+    Change a user's data version after a scan write that skips rollups.
+    
+    Touches the user's latest rollup row; a user without rollups has
+    no scans and nothing cached to invalidate.
+    """
+    latest_day = (
+        select(func.max(ScanDailyRollup.day))
+        .where(ScanDailyRollup.user_id == user_id)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(ScanDailyRollup)
+        .where(ScanDailyRollup.user_id == user_id, ScanDailyRollup.day == latest_day)
+        .values(updated_at=func.now())
+    )
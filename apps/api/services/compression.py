@@ -0,0 +1,250 @@
+"""
+Compression Service
+
+Handles compressed request bodies.
+
+Ingest routers use DecompressingRoute so clients can send gzip or
+zstd bodies with a Content-Encoding header.
+"""
+
+from fastapi import HTTPException, Request
+from fastapi.routing import APIRoute
+from typing import AsyncIterator, Callable, Iterable, List
+import zlib
+
+from config import settings
+from services.metrics import observe_body
+
+try:
+    import zstandard
+except ImportError:  # zstd bodies are optional
+    zstandard = None
+
+# Largest decompressed piece produced at a time, keeps a small
+# compressed chunk from expanding into a huge buffer at once
+DECOMPRESS_STEP_BYTES = 1024 * 1024
+
+# gzip container for zlib (de)compressobj
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+# Errors raised by the decompressors on corrupt input
+DECOMPRESSION_ERRORS = (zlib.error,) + ((zstandard.ZstdError,) if zstandard else ())
+
+
+# =============================================================================
+# Request Bodies
+# =============================================================================
+
+def body_too_large(limit: int) -> HTTPException:
+    """413 for a body that decompresses past the limit."""
+    return HTTPException(status_code=413, detail=f"Decompressed body exceeds {limit} bytes")
+
+
+class GzipStreamDecompressor:
+    """Incremental gzip decompression with bounded output per step."""
+    
+    def __init__(self):
+        self._decompressor = zlib.decompressobj(GZIP_WBITS)
+    
+    def decompress(self, data: bytes) -> Iterable[bytes]:
+        while data:
+            chunk = self._decompressor.decompress(data, DECOMPRESS_STEP_BYTES)
+            if chunk:
+                yield chunk
+            data = self._decompressor.unconsumed_tail
+    
+    def flush(self) -> bytes:
+        if not self._decompressor.eof:
+            raise HTTPException(status_code=400, detail="Truncated gzip body")
+        return self._decompressor.flush()
+
+
+class ZstdOutput:
+    """Sink collecting zstd output that stops decompression past a limit."""
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.total = 0
+        self.pieces: List[bytes] = []
+    
+    def write(self, data) -> int:
+        self.total += len(data)
+        if self.total > self.limit:
+            raise body_too_large(self.limit)
+        self.pieces.append(bytes(data))
+        return len(data)
+
+
+# zstd frame magic numbers (RFC 8878), read by ZstdFrameTracker
+ZSTD_FRAME_MAGIC = 0xFD2FB528
+ZSTD_SKIPPABLE_MAGIC = 0x184D2A50  # low 4 bits are free
+ZSTD_SKIPPABLE_MASK = 0xFFFFFFF0
+
+
+class ZstdFrameTracker:
+    """
+    Follows the frame and block headers of a zstd stream.
+    
+    A stream_writer does not report whether the last frame ended, so
+    complete tells a whole body from a truncated one. Block contents
+    are skipped over, never decompressed here.
+    """
+    
+    def __init__(self):
+        self.frames = 0
+        self._header = b""
+        self._need = 4
+        self._step = self._magic
+        self._skip = 0
+        self._checksum = False
+    
+    @property
+    def complete(self) -> bool:
+        """Whether the input so far ends exactly after a frame."""
+        return self.frames > 0 and self._step == self._magic and not self._header and not self._skip
+    
+    def feed(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            if self._skip:
+                skipped = min(self._skip, len(view))
+                self._skip -= skipped
+                view = view[skipped:]
+                continue
+            missing = self._need - len(self._header)
+            self._header += bytes(view[:missing])
+            view = view[missing:]
+            if len(self._header) == self._need:
+                header, self._header = self._header, b""
+                self._step(int.from_bytes(header, "little"))
+    
+    def _magic(self, magic: int) -> None:
+        if magic == ZSTD_FRAME_MAGIC:
+            self._need, self._step = 1, self._frame_header
+        elif magic & ZSTD_SKIPPABLE_MASK == ZSTD_SKIPPABLE_MAGIC:
+            self._need, self._step = 4, self._skippable_frame
+        else:
+            raise zstandard.ZstdError(f"Unknown frame magic {magic:#x}")
+    
+    def _frame_header(self, descriptor: int) -> None:
+        # Skip the window, dictionary ID and content size fields
+        single_segment = descriptor >> 5 & 1
+        content_size_bytes = (single_segment, 2, 4, 8)[descriptor >> 6]
+        self._skip = (1 - single_segment) + (0, 1, 2, 4)[descriptor & 3] + content_size_bytes
+        self._checksum = bool(descriptor >> 2 & 1)
+        self._need, self._step = 3, self._block_header
+    
+    def _block_header(self, header: int) -> None:
+        # RLE blocks hold one byte; raw and compressed blocks their size
+        block_type = header >> 1 & 3
+        self._skip = 1 if block_type == 1 else header >> 3
+        if header & 1:
+            self._skip += 4 if self._checksum else 0
+            self._end_frame()
+    
+    def _skippable_frame(self, size: int) -> None:
+        self._skip = size
+        self._end_frame()
+    
+    def _end_frame(self) -> None:
+        self.frames += 1
+        self._need, self._step = 4, self._magic
+
+
+class ZstdStreamDecompressor:
+    """
+    Incremental zstd decompression with the size limit checked as it runs.
+    
+    zstandard's decompressobj has no output bound, so one small chunk
+    could expand to gigabytes before it returns. A stream_writer hands
+    output to ZstdOutput in DECOMPRESS_STEP_BYTES pieces instead, which
+    aborts as soon as the body passes the limit. ZstdFrameTracker
+    catches bodies that stop mid-frame.
+    """
+    
+    def __init__(self, limit: int):
+        self._output = ZstdOutput(limit)
+        self._writer = zstandard.ZstdDecompressor().stream_writer(
+            self._output, write_size=DECOMPRESS_STEP_BYTES
+        )
+        self._frames = ZstdFrameTracker()
+    
+    def decompress(self, data: bytes) -> Iterable[bytes]:
+        if data:
+            self._writer.write(data)
+            self._frames.feed(data)
+        pieces, self._output.pieces = self._output.pieces, []
+        yield from pieces
+    
+    def flush(self) -> bytes:
+        if not self._frames.complete:
+            raise HTTPException(status_code=400, detail="Truncated zstd body")
+        return b""
+
+
+def get_decompressor(content_encoding: str, limit: int):
+    """
+    Return a stream decompressor for a Content-Encoding, or None for identity.
+    
+    limit is the most decompressed bytes the body may have.
+    """
+    encoding = content_encoding.strip().lower()
+    if encoding in ("", "identity"):
+        return None
+    if encoding in ("gzip", "x-gzip"):
+        return GzipStreamDecompressor()
+    if encoding == "zstd" and zstandard is not None:
+        return ZstdStreamDecompressor(limit)
+    raise HTTPException(status_code=415, detail=f"Unsupported Content-Encoding: {content_encoding}")
+
+
+class DecompressingRequest(Request):
+    """
+    Request that transparently decompresses its body.
+    
+    Starlette's body() and json() read through stream(), so overriding
+    stream() covers buffered and streaming endpoints alike.
+    """
+    
+    async def stream(self) -> AsyncIterator[bytes]:
+        encoding = self.headers.get("content-encoding", "")
+        limit = settings.max_decompressed_body_bytes
+        decompressor = get_decompressor(encoding, limit)
+        wire_bytes = 0
+        if decompressor is None:
+            async for chunk in super().stream():
+                wire_bytes += len(chunk)
+                yield chunk
+            observe_body(self.scope, encoding, wire_bytes, wire_bytes)
+            return
+        
+        total = 0
+        try:
+            async for chunk in super().stream():
+                wire_bytes += len(chunk)
+                for data in decompressor.decompress(chunk):
+                    total += len(data)
+                    if total > limit:
+                        raise body_too_large(limit)
+                    yield data
+            tail = decompressor.flush()
+        except DECOMPRESSION_ERRORS as e:
+            raise HTTPException(status_code=400, detail=f"Invalid compressed body: {e}")
+        
+        if tail:
+            yield tail
+        observe_body(self.scope, encoding, wire_bytes, total + len(tail))
+
+
+class DecompressingRoute(APIRoute):
+    """Route class that accepts gzip/zstd Content-Encoding on request bodies."""
+    
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+        
+        async def custom_route_handler(request: Request):
+            request = DecompressingRequest(request.scope, request.receive)
+            return await original_route_handler(request)
+        
+        return custom_route_handler
+
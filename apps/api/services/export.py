@@ -0,0 +1,192 @@
+"""
+Export Service
+
+Streams a user's scans and findings as NDJSON or CSV.
+
+Rows are read through a server-side cursor and written out as they
+arrive, so memory stays flat no matter how much history is exported.
+"""
+
+from sqlalchemy import select, case
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+import csv
+import io
+import json
+
+from database import async_session_maker
+from models import Scan, ScanFinding, ToolType
+from services.archive import read_archived_findings
+from services.findings import row_to_finding, legacy_findings, findings_of
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Rows fetched per round-trip from the server-side cursor
+EXPORT_YIELD_PER = 1000
+
+# Output buffered before each yield to the client
+EXPORT_FLUSH_BYTES = 64 * 1024
+
+CSV_COLUMNS = [
+    "scan_id", "tool", "provider", "region", "status", "created_at",
+    "finding_id", "resource_type", "resource_id", "severity", "issue", "remediation",
+]
+
+
+def without_rows(column):
+    """
+    A scan's blob column, NULL on rows joined to a scan_findings row.
+    
+    Scans with rows are exported from them; selecting the blob anyway
+    would repeat it on every finding row of the scan.
+    """
+    return case((ScanFinding.id.is_(None), column)).label(column.key)
+
+
+def scan_record(row: Any) -> Dict[str, Any]:
+    """Scan fields of an export row, in the ScanResponse shape."""
+    return {
+        "id": row.id,
+        "tool": row.tool.value,
+        "provider": row.provider,
+        "region": row.region,
+        "status": row.status.value,
+        "summary": row.summary or {},
+        "project_id": row.project_id,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+    }
+
+
+async def blob_findings(row: Any) -> List[Dict[str, Any]]:
+    """Findings of a scan that has no scan_findings rows."""
+    if row.findings_archive_key is not None:
+        return await read_archived_findings(row.findings_archive_key)
+    return legacy_findings(row.findings or [])
+
+
+def ndjson_scan_open(record: Dict[str, Any]) -> str:
+    """Opening of a scan's NDJSON line, up to the findings array."""
+    return json.dumps(record)[:-1] + ', "findings": ['
+
+
+def ndjson_findings(findings: Iterable[Dict[str, Any]], first: bool) -> str:
+    """Comma-separated findings to append inside the open array."""
+    parts = [json.dumps(f) for f in findings]
+    if not parts:
+        return ""
+    return ("" if first else ", ") + ", ".join(parts)
+
+
+def csv_rows(record: Dict[str, Any], findings: Iterable[Dict[str, Any]]) -> List[List[Any]]:
+    """CSV rows for a scan: one per finding, or one blank row if it has none."""
+    scan_columns = [
+        record["id"], record["tool"], record["provider"], record["region"],
+        record["status"], record["created_at"],
+    ]
+    rows = [
+        scan_columns + [
+            f.get("id"), f.get("resource_type"), f.get("resource_id"),
+            f.get("severity"), f.get("issue"), f.get("remediation"),
+        ]
+        for f in findings
+    ]
+    return rows or [scan_columns + [None] * 6]
+
+
+async def iter_export(
+    user_id: str,
+    export_format: str,
+    tool: Optional[ToolType] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> AsyncIterator[str]:
+    """
+    Yield export output in chunks.
+    
+    Opens its own session: a StreamingResponse body runs after
+    request-scoped dependencies have been closed.
+    """
+    query = (
+        select(
+            Scan.id,
+            Scan.tool,
+            Scan.provider,
+            Scan.region,
+            Scan.status,
+            Scan.summary,
+            without_rows(Scan.findings),
+            Scan.findings_archive_key,
+            Scan.project_id,
+            Scan.created_at,
+            Scan.updated_at,
+            ScanFinding.finding_id,
+            ScanFinding.resource_type,
+            ScanFinding.resource_id,
+            ScanFinding.issue,
+            ScanFinding.severity,
+            ScanFinding.remediation,
+        )
+        .outerjoin(ScanFinding, findings_of(ScanFinding, Scan.id, Scan.created_at))
+        .where(Scan.user_id == user_id)
+        .order_by(Scan.created_at, Scan.id, ScanFinding.position)
+        .execution_options(yield_per=EXPORT_YIELD_PER)
+    )
+    if tool is not None:
+        query = query.where(Scan.tool == tool)
+    if since is not None:
+        query = query.where(Scan.created_at >= since)
+    if until is not None:
+        query = query.where(Scan.created_at < until)
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == "csv":
+        writer.writerow(CSV_COLUMNS)
+    
+    current_id = None
+    first_finding = True
+    
+    async with async_session_maker() as session:
+        result = await session.stream(query)
+        async for row in result:
+            if row.id != current_id:
+                # Close the previous scan's NDJSON line
+                if current_id is not None and export_format == "ndjson":
+                    buffer.write("]}\n")
+                current_id = row.id
+                record = scan_record(row)
+                
+                if row.finding_id is None:
+                    findings = await blob_findings(row)
+                else:
+                    findings = []
+                
+                if export_format == "ndjson":
+                    buffer.write(ndjson_scan_open(record))
+                    buffer.write(ndjson_findings(findings, first=True))
+                    first_finding = not findings
+                elif row.finding_id is None:
+                    writer.writerows(csv_rows(record, findings))
+            
+            if row.finding_id is not None:
+                finding = row_to_finding(row)
+                if export_format == "ndjson":
+                    buffer.write(ndjson_findings([finding], first=first_finding))
+                    first_finding = False
+                else:
+                    writer.writerows(csv_rows(record, [finding]))
+            
+            if buffer.tell() >= EXPORT_FLUSH_BYTES:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        
+        if current_id is not None and export_format == "ndjson":
+            buffer.write("]}\n")
+    
+    if buffer.tell():
+        yield buffer.getvalue()
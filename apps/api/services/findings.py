@@ -0,0 +1,404 @@
+"""
+Findings Service
+
+Reads and writes scan findings in the scan_findings table.
+
+Scans synced before findings were normalized keep their findings
+in the legacy Scan.findings JSON column; reads fall back to it.
+Findings of old scans can be
+moved to the archive (services/archive.py) and are rehydrated on read.
+
+Every finding carries a fingerprint identifying it across scans of
+the same target; the issues service tracks its lifecycle by it.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, update, delete, exists, func, and_, or_
+from sqlalchemy.orm import aliased
+from pydantic import BaseModel, TypeAdapter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+from datetime import datetime
+import hashlib
+
+from models import Scan, ScanFinding, ToolType
+from models.finding import SEARCH_CONFIG
+from services.archive import read_archived_findings, write_archived_findings
+
+
+class FindingScope(NamedTuple):
+    """The scan target a finding belongs to."""
+    tool: ToolType
+    provider: str
+    region: Optional[str]
+
+
+def scan_scope(scan: Scan) -> FindingScope:
+    """The scan target of a scan."""
+    return FindingScope(scan.tool, scan.provider, scan.region)
+
+
+def finding_fingerprint(scope: FindingScope, finding: Dict[str, Any]) -> str:
+    """
+    Stable identity of a finding across scans.
+    
+    Hashes the scan target with the finding's resource and issue;
+    the CLI-assigned finding ID is not stable between runs.
+    """
+    parts = (
+        scope.tool.value,
+        scope.provider,
+        scope.region or "",
+        finding["resource_type"],
+        finding["resource_id"],
+        finding["issue"],
+    )
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def finding_rows(
+    scan_id: str,
+    scan_created_at: datetime,
+    scope: FindingScope,
+    findings: Iterable[Dict[str, Any]],
+    start: int = 0,
+) -> List[Dict[str, Any]]:
+    """Convert finding dicts from an ingest payload into scan_findings rows."""
+    return [
+        {
+            "scan_id": scan_id,
+            "scan_created_at": scan_created_at,
+            "position": position,
+            "fingerprint": finding_fingerprint(scope, f),
+            "finding_id": f["id"],
+            "resource_type": f["resource_type"],
+            "resource_id": f["resource_id"],
+            "issue": f["issue"],
+            "severity": f["severity"],
+            "remediation": f["remediation"],
+        }
+        for position, f in enumerate(findings, start=start)
+    ]
+
+
+def findings_of(findings, scan_id, scan_created_at):
+    """
+    Match the scan_findings rows of a scan.
+    
+    findings is ScanFinding or an alias of it. Matching the partition
+    key as well lets PostgreSQL skip other months' partitions.
+    """
+    return and_(findings.scan_id == scan_id, findings.scan_created_at == scan_created_at)
+
+
+def findings_of_scans(scans: Sequence[Any]):
+    """Match the scan_findings rows of several scans, see findings_of."""
+    return and_(
+        ScanFinding.scan_id.in_([s.id for s in scans]),
+        ScanFinding.scan_created_at.in_({s.created_at for s in scans}),
+    )
+
+
+async def insert_findings(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Write scan_findings rows with a single executemany."""
+    if rows:
+        await db.execute(insert(ScanFinding), rows)
+
+
+# scan_findings columns of the API finding shape, for row_to_finding
+FINDING_COLUMNS = (
+    ScanFinding.finding_id,
+    ScanFinding.resource_type,
+    ScanFinding.resource_id,
+    ScanFinding.issue,
+    ScanFinding.severity,
+    ScanFinding.remediation,
+)
+
+
+def row_to_finding(row: Any) -> Dict[str, Any]:
+    """Convert a scan_findings row back into the API finding shape."""
+    return {
+        "id": row.finding_id,
+        "resource_type": row.resource_type,
+        "resource_id": row.resource_id,
+        "issue": row.issue,
+        "severity": row.severity,
+        "remediation": row.remediation,
+    }
+
+
+class LegacyFinding(BaseModel):
+    """A finding in a legacy Scan.findings blob, which predates ingest validation."""
+    id: str
+    resource_type: str
+    resource_id: str
+    issue: str
+    severity: str
+    remediation: str
+
+
+legacy_findings_adapter = TypeAdapter(List[LegacyFinding])
+
+
+def legacy_findings(blob: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Validate a legacy findings blob into the API finding shape."""
+    return [f.model_dump() for f in legacy_findings_adapter.validate_python(blob)]
+
+
+async def load_findings(db: AsyncSession, scans: Sequence[Scan]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Load findings for several scans with at most one query.
+    
+    Archived scans are read from the archive; rows are only queried
+    for the others. Returns a mapping of scan ID to
+    findings in ingest order.
+    """
+    findings: Dict[str, List[Dict[str, Any]]] = {}
+    row_scans = []
+    for scan in scans:
+        if scan.findings_archive_key is not None:
+            findings[scan.id] = await read_archived_findings(scan.findings_archive_key)
+        else:
+            findings[scan.id] = []
+            row_scans.append(scan)
+    if not row_scans:
+        return findings
+    
+    query = (
+        select(ScanFinding.scan_id, *FINDING_COLUMNS)
+        .where(findings_of_scans(row_scans))
+        .order_by(ScanFinding.scan_id, ScanFinding.position)
+    )
+    result = await db.execute(query)
+    for row in result:
+        findings[row.scan_id].append(row_to_finding(row))
+    
+    # Legacy scans without normalized rows
+    for scan in row_scans:
+        if not findings[scan.id] and scan.findings:
+            findings[scan.id] = legacy_findings(scan.findings)
+    
+    return findings
+
+
+async def load_scan_findings(db: AsyncSession, scan: Scan) -> List[Dict[str, Any]]:
+    """Load findings for a single scan."""
+    findings = await load_findings(db, [scan])
+    return findings[scan.id]
+
+
+# =============================================================================
+# Diffing
+# =============================================================================
+
+# Scans whose findings are read from the archive or a legacy blob
+# instead of scan_findings rows
+has_findings_blob = or_(
+    Scan.findings_archive_key.isnot(None),
+    func.json_array_length(Scan.findings) > 0,
+)
+
+# Scans with scan_findings rows
+has_rows = exists().where(findings_of(ScanFinding, Scan.id, Scan.created_at))
+
+# Scans that can be diffed in SQL: their findings are scan_findings rows
+diffable_in_sql = and_(
+    Scan.findings_archive_key.is_(None),
+    func.coalesce(func.json_array_length(Scan.findings), 0) == 0,
+)
+
+
+def diff_findings(
+    base: List[Dict[str, Any]],
+    head: List[Dict[str, Any]],
+    base_scope: FindingScope,
+    head_scope: FindingScope,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], int]:
+    """
+    Compare two findings lists by finding_fingerprint.
+    
+    Returns (new, resolved, unchanged_count).
+    """
+    base_keys = [finding_fingerprint(base_scope, f) for f in base]
+    head_keys = [finding_fingerprint(head_scope, f) for f in head]
+    base_set, head_set = set(base_keys), set(head_keys)
+    new = [f for f, key in zip(head, head_keys) if key not in base_set]
+    resolved = [f for f, key in zip(base, base_keys) if key not in head_set]
+    return new, resolved, len(base_set & head_set)
+
+
+def missing_from(scan: Any, other_scan: Any):
+    """Findings of a scan whose fingerprint does not appear in another scan."""
+    other = aliased(ScanFinding)
+    return (
+        select(*FINDING_COLUMNS)
+        .where(
+            findings_of(ScanFinding, scan.id, scan.created_at),
+            ~exists().where(
+                findings_of(other, other_scan.id, other_scan.created_at),
+                other.fingerprint == ScanFinding.fingerprint,
+            ),
+        )
+        .order_by(ScanFinding.position)
+    )
+
+
+async def diff_scans(
+    db: AsyncSession,
+    base_scan_id: str,
+    head_scan_id: str,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], int]:
+    """
+    Diff the findings of two scans by fingerprint.
+    
+    When the findings of both scans are scan_findings rows the
+    comparison runs as anti-joins on (scan_id, fingerprint) in SQL and
+    only the deltas are fetched. Other scans are loaded and compared
+    in process.
+    """
+    result = await db.execute(
+        select(Scan.id, Scan.created_at, diffable_in_sql.label("in_sql"))
+        .where(Scan.id.in_([base_scan_id, head_scan_id]))
+    )
+    rows = {row.id: row for row in result}
+    if all(row.in_sql for row in rows.values()):
+        base_scan, head_scan = rows[base_scan_id], rows[head_scan_id]
+        new = (await db.execute(missing_from(head_scan, base_scan))).all()
+        resolved = (await db.execute(missing_from(base_scan, head_scan))).all()
+        
+        base = aliased(ScanFinding)
+        unchanged = await db.scalar(
+            select(func.count(ScanFinding.fingerprint.distinct())).where(
+                findings_of(ScanFinding, head_scan.id, head_scan.created_at),
+                exists().where(
+                    findings_of(base, base_scan.id, base_scan.created_at),
+                    base.fingerprint == ScanFinding.fingerprint,
+                ),
+            )
+        )
+        return [row_to_finding(f) for f in new], [row_to_finding(f) for f in resolved], unchanged or 0
+    
+    scans = (await db.execute(select(Scan).where(Scan.id.in_([base_scan_id, head_scan_id])))).scalars().all()
+    findings = await load_findings(db, scans)
+    scopes = {scan.id: scan_scope(scan) for scan in scans}
+    return diff_findings(
+        findings[base_scan_id], findings[head_scan_id], scopes[base_scan_id], scopes[head_scan_id],
+    )
+
+
+# =============================================================================
+# Archival
+# =============================================================================
+
+async def archive_scans(db: AsyncSession, cutoff: datetime, limit: int) -> int:
+    """
+    Move the findings of up to `limit` scans created before cutoff to the archive.
+    
+    Writes each scan's findings to the archive, then clears its rows and
+    legacy blob and records the archive key; the summary stays on the scan.
+    updated_at is kept, so ETags and clients see no change.
+    The scans are locked, skipping ones another transaction holds.
+    Returns the number of scans archived.
+    """
+    result = await db.execute(
+        select(Scan)
+        .where(
+            Scan.created_at < cutoff,
+            Scan.findings_archive_key.is_(None),
+            or_(has_findings_blob, has_rows),
+        )
+        .order_by(Scan.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    scans = result.scalars().all()
+    if not scans:
+        return 0
+    
+    findings = await load_findings(db, scans)
+    for scan in scans:
+        key = await write_archived_findings(findings[scan.id])
+        await db.execute(
+            update(Scan)
+            .where(Scan.id == scan.id)
+            .values(
+                findings_archive_key=key,
+                findings=[],
+                updated_at=Scan.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    await db.execute(delete(ScanFinding).where(findings_of_scans(scans)))
+    return len(scans)
+
+
+async def referenced_archive_keys(db: AsyncSession, keys: Sequence[str]) -> Set[str]:
+    """The archive keys among keys that some scan still points to."""
+    result = await db.execute(
+        select(Scan.findings_archive_key.distinct()).where(Scan.findings_archive_key.in_(keys))
+    )
+    return set(result.scalars().all())
+
+
+# =============================================================================
+# Search
+# =============================================================================
+
+async def search_findings(
+    db: AsyncSession,
+    user_id: str,
+    query: str,
+    severities: Optional[Sequence[str]] = None,
+    tool: Optional[ToolType] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> List[Any]:
+    """
+    Full-text search over a user's scan_findings rows, best match first.
+    
+    The query uses web search syntax ("quoted phrases", or, -exclude)
+    and is matched against the stored ScanFinding.search_vector.
+    The user's scans are selected first in a materialized CTE, so
+    PostgreSQL can either probe their findings by scan_id and test the
+    stored vector, or intersect the GIN index matches with them,
+    instead of matching every user's findings and filtering after.
+    Archived and legacy findings without rows are not searchable.
+    Returns up to limit + 1 rows so callers can tell if more exist.
+    """
+    scans = select(Scan.id, Scan.tool, Scan.provider, Scan.region, Scan.created_at).where(Scan.user_id == user_id)
+    if tool is not None:
+        scans = scans.where(Scan.tool == tool)
+    if since is not None:
+        scans = scans.where(Scan.created_at >= since)
+    if until is not None:
+        scans = scans.where(Scan.created_at < until)
+    user_scans = scans.cte("user_scans").prefix_with("MATERIALIZED")
+    
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+    rank = func.ts_rank(ScanFinding.search_vector, ts_query).label("rank")
+    
+    stmt = (
+        select(
+            *FINDING_COLUMNS,
+            user_scans.c.id.label("scan_id"),
+            user_scans.c.tool,
+            user_scans.c.provider,
+            user_scans.c.region,
+            user_scans.c.created_at,
+            rank,
+        )
+        .join(user_scans, findings_of(ScanFinding, user_scans.c.id, user_scans.c.created_at))
+        .where(ScanFinding.search_vector.op("@@")(ts_query))
+    )
+    if severities:
+        stmt = stmt.where(ScanFinding.severity.in_(severities))
+    
+    stmt = (
+        stmt.order_by(rank.desc(), user_scans.c.created_at.desc(), ScanFinding.id.desc())
+        .limit(limit + 1)
+        .offset(offset)
+    )
+    result = await db.execute(stmt)
+    return result.all()
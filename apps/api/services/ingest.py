@@ -0,0 +1,75 @@
+"""
+Ingest Service
+
+Writes new scans with everything derived from them, many at a time.
+
+Used by the batch sync endpoint and by the async ingest queue workers.
+All writes join the caller's transaction; the caller commits.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from models import Scan, ScanStatus, ToolType
+from services.findings import FindingScope, finding_rows, insert_findings
+from services.issues import issue_rows, record_issues, resolve_issues
+from services.rollups import scan_rollup, utc_day, record_rollups
+
+
+class NewScan(NamedTuple):
+    """A validated scan that has not been written yet."""
+    scan_id: str
+    user_id: str
+    tool: ToolType
+    status: ScanStatus
+    provider: str
+    region: Optional[str]
+    summary: Dict[str, Any]
+    findings: List[Dict[str, Any]]
+
+
+async def write_scans(db: AsyncSession, scans: List[NewScan]) -> None:
+    """
+    Write scans, their findings, issues and rollups.
+    
+    Uses one multi-row INSERT per table. When several scans share a
+    target, the last one in the list decides which issues are resolved.
+    """
+    if not scans:
+        return
+    
+    rows: List[Dict[str, Any]] = []
+    findings: List[Dict[str, Any]] = []
+    issues: List[Dict[str, Any]] = []
+    latest: Dict[Tuple[str, FindingScope], NewScan] = {}
+    
+    for scan in scans:
+        rows.append({
+            "id": scan.scan_id,
+            "user_id": scan.user_id,
+            "tool": scan.tool,
+            "provider": scan.provider,
+            "region": scan.region,
+            "status": scan.status,
+            "summary": scan.summary,
+        })
+    
+    # Findings rows carry the scan's created_at as their partition key
+    result = await db.execute(insert(Scan).returning(Scan.id, Scan.created_at), rows)
+    created_at = dict(result.tuples().all())
+    
+    for scan in scans:
+        scope = FindingScope(scan.tool, scan.provider, scan.region)
+        findings.extend(finding_rows(scan.scan_id, created_at[scan.scan_id], scope, scan.findings))
+        issues.extend(issue_rows(scan.user_id, scan.scan_id, scope, scan.findings))
+        latest[(scan.user_id, scope)] = scan
+    
+    await insert_findings(db, findings)
+    await record_issues(db, issues)
+    for (user_id, scope), scan in latest.items():
+        await resolve_issues(db, user_id, scan.scan_id, scope, scan.status)
+    await record_rollups(db, [
+        scan_rollup(scan.user_id, scan.tool, scan.status, scan.summary, day=utc_day(created_at[scan.scan_id]))
+        for scan in scans
+    ])
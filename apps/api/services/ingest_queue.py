@@ -0,0 +1,188 @@
+"""
+Ingest Queue Service
+
+In-process queue for asynchronous scan ingest.
+
+POST /api/sync/async validates a scan, enqueues it and answers 202
+right away. A fixed pool of worker tasks drains the queue and writes
+scans in batches with write_scans, so bursts of syncs share a few
+transactions and database connections instead of holding one each.
+
+The queue is bounded by scan count and by the estimated memory of
+the queued findings, so a few huge scans cannot exhaust the process.
+
+The queue and job states live in memory, per process: scans still
+queued when the process dies are lost, and with several workers a
+status poll only sees queued/processing/failed states if it reaches
+the process that accepted the scan. Written scans are found in the
+scans table from any process. Clients that need a durable write should
+use POST /api/sync.
+"""
+
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import asyncio
+import logging
+
+from config import settings
+from database import async_session_maker
+from services.ingest import NewScan, write_scans
+
+logger = logging.getLogger(__name__)
+
+# Job states reported by the status endpoint
+QUEUED = "queued"
+PROCESSING = "processing"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Approximate memory of a finding dict beyond its string contents
+FINDING_OVERHEAD_BYTES = 600
+
+
+def scan_size(scan: NewScan) -> int:
+    """Rough in-memory size of a queued scan, dominated by its findings."""
+    return sum(
+        FINDING_OVERHEAD_BYTES + sum(len(value) for value in f.values() if isinstance(value, str))
+        for f in scan.findings
+    )
+
+
+class IngestQueueFull(Exception):
+    """Raised by IngestQueue.submit when the queue is at capacity."""
+
+
+class IngestQueue:
+    """Queue of NewScans, bounded by count and estimated bytes, drained by background workers."""
+    
+    def __init__(self, max_size: int, max_bytes: int, workers: int, batch_size: int, status_retention: int):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.worker_count = workers
+        self.batch_size = batch_size
+        self.status_retention = status_retention
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._bytes = 0  # scan_size of queued and in-flight scans
+        # scan_id -> (user_id, state, error), oldest first
+        self._jobs: "OrderedDict[str, Tuple[str, str, Optional[str]]]" = OrderedDict()
+    
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+    
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+    
+    def start(self) -> None:
+        """Start the workers; call from the running event loop."""
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"ingest-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+    
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Let the workers drain the queue for up to `timeout` seconds, then cancel them."""
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Ingest queue stopped with {self.depth()} scans unwritten")
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+    
+    def submit(self, scan: NewScan) -> None:
+        """
+        Enqueue a scan without waiting.
+        
+        Raises IngestQueueFull when the queue is at capacity, so the
+        endpoint can push back on the client instead of buffering.
+        A scan larger than max_bytes on its own is only accepted when
+        nothing else is queued.
+        """
+        if not self.running:
+            raise IngestQueueFull("Ingest queue is not running")
+        size = scan_size(scan)
+        if self._bytes and self._bytes + size > self.max_bytes:
+            raise IngestQueueFull(f"Ingest queue is full ({self.max_bytes} bytes)")
+        try:
+            self._queue.put_nowait((scan, size))
+        except asyncio.QueueFull:
+            raise IngestQueueFull(f"Ingest queue is full ({self.max_size} scans)")
+        self._bytes += size
+        self._set_state(scan, QUEUED)
+    
+    def status(self, scan_id: str, user_id: str) -> Optional[Tuple[str, Optional[str]]]:
+        """(state, error) of a recent job of this user in this process, or None if unknown."""
+        job = self._jobs.get(scan_id)
+        if job is None or job[0] != user_id:
+            return None
+        return job[1], job[2]
+    
+    def _set_state(self, scan: NewScan, state: str, error: Optional[str] = None) -> None:
+        self._jobs[scan.scan_id] = (scan.user_id, state, error)
+        self._jobs.move_to_end(scan.scan_id)
+        while len(self._jobs) > self.status_retention:
+            self._jobs.popitem(last=False)
+    
+    async def _next_batch(self) -> List[Tuple[NewScan, int]]:
+        """Wait for one (scan, size), then take whatever else is already queued."""
+        batch = [await self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+    
+    async def _write(self, scans: List[NewScan]) -> None:
+        async with async_session_maker() as session:
+            await write_scans(session, scans)
+            await session.commit()
+    
+    async def _worker(self) -> None:
+        while True:
+            items = await self._next_batch()
+            batch = [scan for scan, _ in items]
+            try:
+                for scan in batch:
+                    self._set_state(scan, PROCESSING)
+                try:
+                    await self._write(batch)
+                    for scan in batch:
+                        self._set_state(scan, COMPLETED)
+                except Exception:
+                    if len(batch) == 1:
+                        raise
+                    # Retry one by one so a single bad scan does not fail the batch
+                    logger.exception(f"Ingest batch of {len(batch)} scans failed, retrying individually")
+                    for scan in batch:
+                        try:
+                            await self._write([scan])
+                            self._set_state(scan, COMPLETED)
+                        except Exception as e:
+                            logger.exception(f"Ingest of scan {scan.scan_id} failed")
+                            self._set_state(scan, FAILED, str(e))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Ingest of scan {batch[0].scan_id} failed")
+                self._set_state(batch[0], FAILED, str(e))
+            finally:
+                for _, size in items:
+                    self._bytes -= size
+                    self._queue.task_done()
+
+
+# Global queue, started and stopped by the application lifespan
+ingest_queue = IngestQueue(
+    max_size=settings.ingest_queue_size,
+    max_bytes=settings.ingest_queue_max_bytes,
+    workers=settings.ingest_workers,
+    batch_size=settings.ingest_batch_size,
+    status_retention=settings.ingest_status_retention,
+)
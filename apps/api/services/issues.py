@@ -0,0 +1,101 @@
+"""
+Issues Service
+
+Maintains the issue lifecycle table from ingested findings.
+
+Ingest paths call record_issues for every batch of findings they
+write and resolve_issues once a completed scan has been written.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import update, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Any, Dict, Iterable, List
+
+from models import Issue, ScanStatus
+from services.findings import FindingScope, finding_fingerprint
+
+# Issues per upsert statement, keeps bind parameters under the
+# PostgreSQL protocol limit of 32767
+ISSUE_UPSERT_BATCH = 1000
+
+
+def issue_rows(
+    user_id: str,
+    scan_id: str,
+    scope: FindingScope,
+    findings: Iterable[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """Build issue upsert rows for findings seen in a scan."""
+    return [
+        {
+            "user_id": user_id,
+            "fingerprint": finding_fingerprint(scope, f),
+            "tool": scope.tool,
+            "provider": scope.provider,
+            "region": scope.region,
+            "resource_type": f["resource_type"],
+            "resource_id": f["resource_id"],
+            "issue": f["issue"],
+            "severity": f["severity"],
+            "first_seen": func.now(),
+            "last_seen": func.now(),
+            "first_scan_id": scan_id,
+            "last_scan_id": scan_id,
+        }
+        for f in findings
+    ]
+
+
+async def record_issues(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """
+    Upsert issues seen at ingest.
+    
+    New fingerprints are inserted; known ones get their severity and
+    last_seen updated and are reopened if they had been resolved.
+    """
+    # One statement cannot touch the same row twice; the last sighting wins
+    unique = list({(row["user_id"], row["fingerprint"]): row for row in rows}.values())
+    
+    for start in range(0, len(unique), ISSUE_UPSERT_BATCH):
+        stmt = pg_insert(Issue).values(unique[start:start + ISSUE_UPSERT_BATCH])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Issue.user_id, Issue.fingerprint],
+            set_={
+                "severity": stmt.excluded.severity,
+                "last_seen": stmt.excluded.last_seen,
+                "last_scan_id": stmt.excluded.last_scan_id,
+                "resolved_at": None,
+            },
+        )
+        await db.execute(stmt)
+
+
+async def resolve_issues(
+    db: AsyncSession,
+    user_id: str,
+    scan_id: str,
+    scope: FindingScope,
+    status: ScanStatus,
+) -> None:
+    """
+    Resolve open issues of a target that a scan no longer reports.
+    
+    Only completed scans resolve issues; partial or failed runs
+    say nothing about findings they did not report.
+    """
+    if status != ScanStatus.COMPLETED:
+        return
+    
+    await db.execute(
+        update(Issue)
+        .where(
+            Issue.user_id == user_id,
+            Issue.tool == scope.tool,
+            Issue.provider == scope.provider,
+            Issue.region.is_not_distinct_from(scope.region),
+            Issue.resolved_at.is_(None),
+            Issue.last_scan_id != scan_id,
+        )
+        .values(resolved_at=func.now())
+    )
@@ -0,0 +1,208 @@
+"""
+Metrics Service
+
+Prometheus metrics for request latency, database timing and ingest sizes.
+
+main.py installs MetricsMiddleware, attaches the engine listeners and
+serves the registry at /metrics. Routers observe ingest sizes directly.
+"""
+
+from fastapi import Header, HTTPException
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from typing import Any, Callable, Dict, Optional
+import hmac
+import time
+
+from config import settings
+from services.statement_timing import observe_statements
+
+# Size buckets shared by findings counts, roughly x10 apart
+COUNT_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+# Body size buckets from 1 KiB to 1 GiB, x4 apart
+BYTE_BUCKETS = tuple(1024 * 4 ** i for i in range(11))
+
+
+# =============================================================================
+# Metrics
+# =============================================================================
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled.",
+    ["method"],
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Database statement execution time by statement type.",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total",
+    "Database statements that raised an error, by statement type.",
+    ["operation"],
+)
+
+INGEST_FINDINGS = Histogram(
+    "ingest_findings_per_scan",
+    "Findings received per ingested scan, by endpoint.",
+    ["endpoint"],
+    buckets=COUNT_BUCKETS,
+)
+INGEST_QUEUE_DEPTH = Gauge(
+    "ingest_queue_depth",
+    "Scans waiting in the async ingest queue.",
+)
+INGEST_BODY_BYTES = Histogram(
+    "ingest_body_bytes",
+    "Request body size on the wire, by route and Content-Encoding.",
+    ["route", "encoding"],
+    buckets=BYTE_BUCKETS,
+)
+INGEST_DECODED_BODY_BYTES = Histogram(
+    "ingest_decoded_body_bytes",
+    "Request body size after decompression, by route and Content-Encoding.",
+    ["route", "encoding"],
+    buckets=BYTE_BUCKETS,
+)
+
+
+# =============================================================================
+# Helper Functions
+# =============================================================================
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """
+    Route path template of a request, e.g. /api/scans/{scan_id}.
+    
+    Raw paths are never used as labels to keep cardinality bounded.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def statement_operation(statement: str) -> str:
+    """Leading SQL keyword of a statement (SELECT, INSERT, ...)."""
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH") else "OTHER"
+
+
+def observe_body(scope: Dict[str, Any], encoding: str, wire_bytes: int, decoded_bytes: int) -> None:
+    """Record the size of a request body read by an ingest route."""
+    route = route_template(scope)
+    encoding = encoding.strip().lower() or "identity"
+    INGEST_BODY_BYTES.labels(route, encoding).observe(wire_bytes)
+    INGEST_DECODED_BODY_BYTES.labels(route, encoding).observe(decoded_bytes)
+
+
+def require_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Guard /metrics and /health/db, which expose internal pool and traffic data.
+    
+    Scrapers send settings.metrics_token as a Bearer token. Without a
+    configured token the endpoints only exist in development.
+    """
+    if not settings.metrics_token:
+        if settings.environment == "development":
+            return
+        raise HTTPException(status_code=404, detail="Not Found")
+    
+    if not hmac.compare_digest(authorization or "", f"Bearer {settings.metrics_token}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+
+# =============================================================================
+# Middleware
+# =============================================================================
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency and in-flight requests."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        status_code = 500
+        
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            # The router stores the matched route in the shared scope
+            HTTP_REQUEST_DURATION.labels(method, route_template(scope), str(status_code)).observe(
+                time.perf_counter() - start
+            )
+
+
+# =============================================================================
+# Database
+# =============================================================================
+
+def observe_statement(statement: str, seconds: float) -> None:
+    """Record one statement's execution time by statement type."""
+    DB_QUERY_DURATION.labels(statement_operation(statement)).observe(seconds)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every statement executed through the engine."""
+    sync_engine = engine.sync_engine
+    observe_statements(engine, observe_statement)
+    
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        statement = exception_context.statement or ""
+        DB_QUERY_ERRORS.labels(statement_operation(statement)).inc()
+
+
+class PoolCollector:
+    """Collector exposing connection pool usage at scrape time."""
+    
+    def __init__(self, pool_status: Callable[[], Dict[str, Any]]):
+        self.pool_status = pool_status
+    
+    def collect(self):
+        status = self.pool_status()
+        for name, key, documentation in (
+            ("db_pool_size", "size", "Connections kept open by the pool."),
+            ("db_pool_checked_out", "checked_out", "Connections currently checked out."),
+            ("db_pool_overflow", "overflow", "Connections open beyond the pool size."),
+        ):
+            yield GaugeMetricFamily(name, documentation, value=status[key])
+        yield CounterMetricFamily("db_pool_checkouts", "Connection checkouts.", value=status["checkouts"])
+        yield CounterMetricFamily("db_pool_timeouts", "Checkouts that timed out waiting.", value=status["timeouts"])
+        yield CounterMetricFamily(
+            "db_pool_wait_seconds", "Time spent waiting for a free connection.", value=status["wait_seconds_total"]
+        )
+        yield CounterMetricFamily("db_pool_connects", "New connections opened by checkouts.", value=status["connects"])
+        yield CounterMetricFamily(
+            "db_pool_connect_seconds", "Time spent opening new connections.", value=status["connect_seconds_total"]
+        )
+
+
+def register_pool_collector(pool_status: Callable[[], Dict[str, Any]]) -> None:
+    """Expose pool usage from database.get_pool_status in the default registry."""
+    REGISTRY.register(PoolCollector(pool_status))
@@ -0,0 +1,37 @@
+"""
+NDJSON Service
+
+Incremental parsing of newline-delimited JSON request bodies.
+"""
+
+from typing import AsyncIterator
+
+# Longest single NDJSON line accepted (one header or one finding)
+MAX_LINE_BYTES = 1024 * 1024
+
+
+class NDJSONError(ValueError):
+    """Raised when an NDJSON body cannot be split into lines."""
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[bytes]:
+    """
+    Yield non-empty lines from a stream of byte chunks.
+    
+    Only the current partial line is buffered, so memory is bounded by
+    max_line_bytes regardless of the body size.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield line
+        if len(buffer) > max_line_bytes:
+            raise NDJSONError(f"Line exceeds {max_line_bytes} bytes")
+    
+    buffer = buffer.strip()
+    if buffer:
+        yield buffer
@@ -0,0 +1,486 @@
+"""
+Partitions Service
+
+Monthly range partitions of scans and scan_findings, and data retention.
+
+On a fresh database both tables are created partitioned by month of
+created_at (scan_findings by its copy, scan_created_at), so a scan and
+its findings share a month. Queries bounded on created_at only touch
+the matching partitions, and expired months are removed by dropping
+or detaching a partition instead of deleting rows. Rows outside every
+monthly partition land in a default partition; they are moved out when
+their month's partition is created. Tables created before partitioning
+stay plain tables and are trimmed with batched deletes; converting
+them needs a manual data migration.
+
+Retention is per tier (settings.retention_days). Partitions are shared
+by every user, so a whole month is removed only once it is past the
+longest retention; shorter tiers and the default partition are trimmed
+with batched deletes, which partition pruning keeps to the old months.
+Expired scans are subtracted from the rollups, as deleting a scan does.
+
+The same background task archives findings of old scans when
+settings.archive_enabled is on (see services/archive.py), and deletes
+archive files no scan references any more. Every worker
+runs the task; a lock lets one process at a time do the work.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy import select, delete, func, text, true
+from sqlalchemy.sql import ColumnElement
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import re
+
+from config import settings
+from database import engine, async_session_maker
+from models import Scan, User, ScanDailyRollup
+from services.caching import bump_user_data_version
+from services.archive import get_archive_store
+from services.findings import archive_scans, referenced_archive_keys
+from services.rollups import daily_totals, project_totals, remove_daily_totals, remove_project_totals
+
+logger = logging.getLogger(__name__)
+
+# Partitioned tables, referenced tables first
+PARTITIONED_TABLES = ("scans", "scan_findings")
+
+# Partition key column of each partitioned table
+PARTITION_KEYS = {"scans": "created_at", "scan_findings": "scan_created_at"}
+
+# Transaction-level advisory lock serializing partition DDL across processes
+PARTITION_LOCK_ID = 7_300_240_001
+
+# Advisory lock held by the one process running maintenance
+MAINTENANCE_LOCK_ID = 7_300_240_002
+
+# Archive keys checked against scans per query during garbage collection
+ARCHIVE_GC_BATCH_SIZE = 1000
+
+
+# =============================================================================
+# Partitions
+# =============================================================================
+
+def month_start(moment: datetime) -> datetime:
+    """Start of the UTC month containing a moment."""
+    moment = moment.astimezone(timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """The month start `months` months after another (before, if negative)."""
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    """Name of a table's partition for a month, e.g. scans_p2026_01."""
+    return f"{table}_p{month:%Y_%m}"
+
+
+def partition_month(table: str, name: str) -> Optional[datetime]:
+    """Month of a monthly partition from its name; None for other partitions."""
+    match = re.fullmatch(rf"{table}_p(\d{{4}})_(\d{{2}})", name)
+    if match is None:
+        return None
+    return datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)
+
+
+async def lock_partitions(conn) -> None:
+    """Serialize partition DDL with other processes until the transaction ends."""
+    await conn.execute(select(func.pg_advisory_xact_lock(PARTITION_LOCK_ID)))
+
+
+async def is_partitioned(conn, table: str) -> bool:
+    """Whether a table was created partitioned."""
+    result = await conn.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table},
+    )
+    return bool(result.scalar())
+
+
+async def is_plain_table(conn, table: str) -> bool:
+    """Whether a table exists and was created without partitioning."""
+    result = await conn.execute(
+        text("SELECT relkind = 'r' FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table},
+    )
+    return bool(result.scalar())
+
+
+async def list_partitions(conn, table: str) -> Dict[datetime, str]:
+    """Monthly partitions of a table, keyed by month."""
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    )
+    partitions = {}
+    for name in result.scalars():
+        month = partition_month(table, name)
+        if month is not None:
+            partitions[month] = name
+    return partitions
+
+
+async def stored_columns(conn, table: str) -> List[str]:
+    """Columns of a table that can be inserted into: all but generated ones."""
+    result = await conn.execute(
+        text(
+            "SELECT attname FROM pg_attribute WHERE attrelid = to_regclass(:table) "
+            "AND attnum > 0 AND NOT attisdropped AND attgenerated = '' ORDER BY attnum"
+        ),
+        {"table": table},
+    )
+    return result.scalars().all()
+
+
+async def create_month_partitions(conn, month: datetime, tables: List[str]) -> List[str]:
+    """
+    Create a month's partitions of tables, in PARTITIONED_TABLES order.
+    
+    PostgreSQL refuses to add a partition while the default partition
+    holds rows in its range, so each one is created as a standalone
+    table, given the default partition's rows for the month, then
+    attached. Findings move first: deleting a scan from the default
+    partition cascades to the findings still referencing it.
+    """
+    bounds = f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    names = {table: partition_name(table, month) for table in tables}
+    
+    for table in reversed(tables):
+        name = names[table]
+        await conn.execute(text(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING ALL)'))
+        if not await is_plain_table(conn, f"{table}_default"):
+            continue
+        key = PARTITION_KEYS[table]
+        columns = ", ".join(f'"{column}"' for column in await stored_columns(conn, name))
+        result = await conn.execute(
+            text(
+                f'WITH moved AS (DELETE FROM "{table}_default" WHERE "{key}" >= :start AND "{key}" < :end '
+                f"RETURNING {columns}) "
+                f'INSERT INTO "{name}" ({columns}) SELECT {columns} FROM moved'
+            ),
+            {"start": month, "end": add_months(month, 1)},
+        )
+        if result.rowcount:
+            logger.info(f"Moved {result.rowcount} rows from {table}_default to {name}")
+    
+    for table in tables:
+        await conn.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{names[table]}" FOR VALUES {bounds}'))
+    return list(names.values())
+
+
+async def ensure_partitions(conn: AsyncConnection, now: Optional[datetime] = None) -> List[str]:
+    """
+    Create this month's and the upcoming monthly partitions.
+    
+    Also creates a default partition for rows outside every month,
+    such as scans with a skewed clock. Returns the names created;
+    does nothing for tables that are not partitioned.
+    """
+    current = month_start(now or datetime.now(timezone.utc))
+    created = []
+    
+    await lock_partitions(conn)
+    tables = [table for table in PARTITIONED_TABLES if await is_partitioned(conn, table)]
+    existing = {table: await list_partitions(conn, table) for table in tables}
+    for offset in range(settings.partition_months_ahead + 1):
+        month = add_months(current, offset)
+        missing = [table for table in tables if month not in existing[table]]
+        if missing:
+            created.extend(await create_month_partitions(conn, month, missing))
+    
+    for table in tables:
+        await conn.execute(text(f'CREATE TABLE IF NOT EXISTS "{table}_default" PARTITION OF "{table}" DEFAULT'))
+    
+    return created
+
+
+# =============================================================================
+# Retention
+# =============================================================================
+
+def longest_retention_days() -> int:
+    """Retention of the longest-kept tier; whole partitions expire after it."""
+    return max(settings.retention_default_days, *settings.retention_days.values())
+
+
+def retention_groups() -> List[Tuple[int, ColumnElement]]:
+    """
+    Retention days and owner filter of each tier kept shorter than the longest.
+    
+    Users without a users row or with an unlisted tier get
+    settings.retention_default_days.
+    """
+    longest = longest_retention_days()
+    groups = [
+        (days, Scan.user_id.in_(select(User.clerk_id).where(User.tier == tier)))
+        for tier, days in settings.retention_days.items()
+        if days < longest
+    ]
+    if settings.retention_default_days < longest:
+        known = select(User.clerk_id).where(User.tier.in_(list(settings.retention_days)))
+        groups.append((settings.retention_default_days, Scan.user_id.not_in(known)))
+    return groups
+
+
+async def remove_expired_partitions(now: datetime) -> List[str]:
+    """
+    Drop, or detach, monthly partitions past the longest retention.
+    
+    A month is removed once it has ended more than the longest retention
+    ago, findings before scans, one transaction per month, and its
+    scans are subtracted from the rollups. Detached partitions lose
+    their foreign keys and are left as standalone tables for archiving.
+    """
+    cutoff = now - timedelta(days=longest_retention_days())
+    removed = []
+    
+    async with async_session_maker() as db:
+        expired = set()
+        for table in PARTITIONED_TABLES:
+            if await is_partitioned(db, table):
+                months = await list_partitions(db, table)
+                expired.update(month for month in months if add_months(month, 1) <= cutoff)
+    
+    for month in sorted(expired):
+        next_month = add_months(month, 1)
+        in_month = (Scan.created_at >= month, Scan.created_at < next_month)
+        async with async_session_maker() as db:
+            await lock_partitions(db)
+            user_ids = []
+            projects = []
+            for table in reversed(PARTITIONED_TABLES):
+                name = (await list_partitions(db, table)).get(month)
+                if name is None:
+                    continue
+                if table == "scans":
+                    result = await db.execute(select(Scan.user_id.distinct()).where(*in_month))
+                    user_ids = result.scalars().all()
+                    projects = (await db.execute(project_totals(*in_month))).all()
+                    # Daily rollups of the month count exactly its scans
+                    await db.execute(
+                        delete(ScanDailyRollup)
+                        .where(ScanDailyRollup.day >= month.date(), ScanDailyRollup.day < next_month.date())
+                    )
+                
+                await db.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+                if settings.retention_detach_partitions:
+                    result = await db.execute(
+                        text("SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:name) AND contype = 'f'"),
+                        {"name": name},
+                    )
+                    for constraint in result.scalars().all():
+                        await db.execute(text(f'ALTER TABLE "{name}" DROP CONSTRAINT "{constraint}"'))
+                else:
+                    await db.execute(text(f'DROP TABLE "{name}"'))
+                removed.append(name)
+            
+            await remove_project_totals(db, projects)
+            for user_id in user_ids:
+                await bump_user_data_version(db, user_id)
+            await db.commit()
+    
+    return removed
+
+
+async def delete_expired_scans(cutoff: datetime, owner: ColumnElement) -> int:
+    """
+    Delete scans created before a cutoff, in batches of settings.retention_batch_size.
+    
+    Findings go with them through the ON DELETE CASCADE foreign key,
+    and their totals are subtracted from the rollups in the same
+    transaction. Each batch commits on its own to keep locks and WAL
+    bursts short.
+    """
+    deleted = 0
+    while True:
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(Scan.id)
+                .where(Scan.created_at < cutoff, owner)
+                .limit(settings.retention_batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            expired = (Scan.id.in_(result.scalars().all()), Scan.created_at < cutoff)
+            daily = (await db.execute(daily_totals(*expired))).all()
+            projects = (await db.execute(project_totals(*expired))).all()
+            
+            result = await db.execute(
+                delete(Scan)
+                .where(*expired)
+                .returning(Scan.user_id)
+                .execution_options(synchronize_session=False)
+            )
+            user_ids = result.scalars().all()
+            await remove_daily_totals(db, daily)
+            await remove_project_totals(db, projects)
+            for user_id in set(user_ids):
+                await bump_user_data_version(db, user_id)
+            await db.commit()
+        
+        deleted += len(user_ids)
+        if len(user_ids) < settings.retention_batch_size:
+            return deleted
+
+
+async def apply_retention(now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Remove scans and findings older than their owner's tier retention.
+    
+    Partitioned data past the longest retention is kept until its whole
+    month has expired, then removed as a partition. The default
+    partition is never dropped; its rows are deleted once their month
+    has expired.
+    """
+    now = now or datetime.now(timezone.utc)
+    removed = await remove_expired_partitions(now)
+    
+    cutoffs = [(now - timedelta(days=days), owner) for days, owner in retention_groups()]
+    longest_cutoff = now - timedelta(days=longest_retention_days())
+    async with async_session_maker() as db:
+        partitioned = await is_partitioned(db, "scans")
+    cutoffs.append((month_start(longest_cutoff) if partitioned else longest_cutoff, true()))
+    
+    deleted = 0
+    for cutoff, owner in cutoffs:
+        deleted += await delete_expired_scans(cutoff, owner)
+    
+    return {"partitions_removed": len(removed), "scans_deleted": deleted}
+
+
+# =============================================================================
+# Archival
+# =============================================================================
+
+async def archive_old_findings(now: Optional[datetime] = None) -> int:
+    """
+    Archive findings of scans older than settings.archive_after_days.
+    
+    Runs in batches of settings.archive_batch_size scans, each in its
+    own transaction. Returns the number of scans archived.
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=settings.archive_after_days)
+    archived = 0
+    while True:
+        async with async_session_maker() as db:
+            count = await archive_scans(db, cutoff, settings.archive_batch_size)
+            await db.commit()
+        
+        archived += count
+        if count < settings.archive_batch_size:
+            return archived
+
+
+async def collect_archive_garbage(now: Optional[datetime] = None) -> int:
+    """
+    Delete archive files that no scan references any more.
+    
+    Files are shared by scans with identical findings, so a file is
+    only garbage once its last scan is deleted or expired. Files written
+    within settings.archive_gc_grace_seconds are kept, covering archive
+    batches whose scans are not committed yet. Returns the number of
+    files deleted.
+    """
+    written_before = (now or datetime.now(timezone.utc)).timestamp() - settings.archive_gc_grace_seconds
+    store = get_archive_store()
+    keys = await asyncio.to_thread(store.list_keys, written_before)
+    
+    deleted = 0
+    for start in range(0, len(keys), ARCHIVE_GC_BATCH_SIZE):
+        batch = keys[start:start + ARCHIVE_GC_BATCH_SIZE]
+        async with async_session_maker() as db:
+            referenced = await referenced_archive_keys(db, batch)
+        for key in batch:
+            if key not in referenced:
+                await asyncio.to_thread(store.delete, key)
+                deleted += 1
+    return deleted
+
+
+# =============================================================================
+# Maintenance Task
+# =============================================================================
+
+@asynccontextmanager
+async def maintenance_lock() -> AsyncIterator[bool]:
+    """
+    Try to take the maintenance lock for the block; yields whether it was taken.
+    
+    The lock is transaction-level, held by an otherwise idle transaction
+    on a connection of its own, so it also works behind pgbouncer in
+    transaction mode. It is released when the block exits.
+    """
+    async with engine.connect() as conn:
+        async with conn.begin():
+            yield bool(await conn.scalar(select(func.pg_try_advisory_xact_lock(MAINTENANCE_LOCK_ID))))
+
+
+async def run_maintenance() -> None:
+    """
+    Create upcoming partitions, then apply retention and archival if enabled.
+    
+    Does nothing while another process runs maintenance.
+    """
+    async with maintenance_lock() as locked:
+        if not locked:
+            return
+        
+        async with engine.begin() as conn:
+            created = await ensure_partitions(conn)
+        if created:
+            logger.info(f"Created partitions: {', '.join(created)}")
+        
+        if settings.retention_enabled:
+            result = await apply_retention()
+            logger.info(
+                f"Retention removed {result['partitions_removed']} partitions "
+                f"and {result['scans_deleted']} scans"
+            )
+        
+        if settings.archive_enabled:
+            archived = await archive_old_findings()
+            logger.info(f"Archived findings of {archived} scans")
+        
+        # Also after archiving is turned off: scans keep being deleted
+        collected = await collect_archive_garbage()
+        if collected:
+            logger.info(f"Deleted {collected} unreferenced archive files")
+
+
+class PartitionMaintenance:
+    """Background task running run_maintenance at a fixed interval."""
+    
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Start the task; call from the running event loop."""
+        self._task = asyncio.create_task(self._run(), name="partition-maintenance")
+    
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                await run_maintenance()
+            except Exception as e:
+                logger.error(f"Partition maintenance failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+
+partition_maintenance = PartitionMaintenance(settings.partition_maintenance_interval_seconds)
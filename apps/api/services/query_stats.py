@@ -0,0 +1,125 @@
+"""
+Query Stats Service
+
+Counts and times the SQL statements issued while handling each request.
+
+QueryStatsMiddleware opens a RequestQueryStats for every HTTP request;
+track_engine_queries adds each statement to it through the shared
+statement timing listeners (services/statement_timing.py).
+Requests above settings.query_log_max_queries statements or
+settings.query_log_max_seconds are logged with their statements, which
+makes N+1 patterns show up as one statement repeated many times.
+"""
+
+from contextvars import ContextVar
+from sqlalchemy.ext.asyncio import AsyncEngine
+from typing import Dict, List, Optional, Tuple
+import logging
+import time
+
+from config import settings
+from services.statement_timing import observe_statements
+
+logger = logging.getLogger(__name__)
+
+# Distinct statements kept per request for the slow request log
+MAX_LOGGED_STATEMENTS = 20
+
+# Longest statement text kept in the log
+MAX_STATEMENT_CHARS = 500
+
+
+class RequestQueryStats:
+    """Statements executed during one request, grouped by SQL text."""
+    
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Dict[str, List[float]] = {}  # SQL -> [count, seconds]
+    
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        entry = self.statements.setdefault(statement, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+    
+    def top_statements(self) -> List[Tuple[str, int, float]]:
+        """Statements by total time, most expensive first."""
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [(sql, int(count), seconds) for sql, (count, seconds) in ranked[:MAX_LOGGED_STATEMENTS]]
+
+
+# Stats of the request being handled in the current context
+current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def debug_headers_enabled() -> bool:
+    """Whether to send X-DB-Queries/X-DB-Time, off in production by default."""
+    if settings.query_debug_headers is not None:
+        return settings.query_debug_headers
+    return settings.environment != "production"
+
+
+def record_statement(statement: str, seconds: float) -> None:
+    """Add a statement to the current request's stats, if any."""
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, seconds)
+
+
+def track_engine_queries(engine: AsyncEngine) -> None:
+    """Add every statement executed through the engine to the current request's stats."""
+    observe_statements(engine, record_statement)
+
+
+def log_request(method: str, path: str, stats: RequestQueryStats, seconds: float) -> None:
+    """Log a request that crossed a query count or duration threshold."""
+    lines = [
+        f"{count}x {statement_seconds * 1000:.1f}ms  {' '.join(sql.split())[:MAX_STATEMENT_CHARS]}"
+        for sql, count, statement_seconds in stats.top_statements()
+    ]
+    logger.warning(
+        "%s %s issued %d queries in %.1fms (request %.1fms):\n%s",
+        method, path, stats.count, stats.seconds * 1000, seconds * 1000, "\n".join(lines),
+    )
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware tracking the SQL statements of each request.
+    
+    Adds X-DB-Queries (statement count) and X-DB-Time (milliseconds)
+    response headers when debug headers are enabled. Statements run
+    after the response has started, e.g. in a streamed export body,
+    are only reflected in the log.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        self.send_headers = debug_headers_enabled()
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        stats = RequestQueryStats()
+        token = current_query_stats.set(stats)
+        
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and self.send_headers:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((b"x-db-time", f"{stats.seconds * 1000:.2f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+        
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            current_query_stats.reset(token)
+            seconds = time.perf_counter() - start
+            if stats.count > settings.query_log_max_queries or seconds > settings.query_log_max_seconds:
+                log_request(scope["method"], scope["path"], stats, seconds)
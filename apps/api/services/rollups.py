@@ -0,0 +1,308 @@
+"""
+Rollups Service
+
+Maintains the per-user daily scan rollups used by stats endpoints and
+the per-project rollups behind project summaries.
+
+Callers pass rollup deltas for the scans they write or delete, inside
+the same transaction, so rollups always match the scans table.
+Retention removes scans in bulk and subtracts their totals instead
+(see services/partitions.py).
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncConnection
+from sqlalchemy import select, update, delete, func, cast, exists, literal_column, Date
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import ColumnElement
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from models import Scan, ScanStatus, ToolType, ScanDailyRollup, ScanProjectRollup
+
+# Summary fields totalled per rollup row
+SUMMARY_FIELDS = ("resources_scanned", "issues_found", "critical", "high", "medium", "low")
+
+# Every counter column in a rollup row
+COUNTER_FIELDS = ("scan_count", "in_progress") + SUMMARY_FIELDS
+
+
+def utc_today() -> date:
+    """Current UTC day, the granularity of rollup rows."""
+    return datetime.now(timezone.utc).date()
+
+
+def scan_rollup(
+    user_id: str,
+    tool: ToolType,
+    status: ScanStatus,
+    summary: Dict[str, Any],
+    day: Optional[date] = None,
+    sign: int = 1,
+) -> Dict[str, Any]:
+    """
+    Build the rollup delta for one scan.
+    
+    Pass the scan's scan_day as day once it has a created_at, so the
+    rollup day follows the database clock like created_at does; it
+    defaults to the current UTC day. Use sign=-1 when the scan is
+    being deleted.
+    """
+    delta = {
+        "user_id": user_id,
+        "day": day or utc_today(),
+        "tool": tool,
+        "scan_count": sign,
+        "in_progress": sign if status == ScanStatus.IN_PROGRESS else 0,
+    }
+    for field in SUMMARY_FIELDS:
+        delta[field] = sign * int(summary.get(field) or 0)
+    return delta
+
+
+def utc_day(moment: datetime) -> date:
+    """UTC day of a timestamp."""
+    return moment.astimezone(timezone.utc).date()
+
+
+def scan_day(scan: Scan) -> date:
+    """UTC day an existing scan is counted under."""
+    return utc_day(scan.created_at)
+
+
+async def record_rollups(db: AsyncSession, deltas: Iterable[Dict[str, Any]]) -> None:
+    """
+    Apply rollup deltas with a single upsert.
+    
+    Deltas for the same (user, day, tool) are merged first because one
+    INSERT ... ON CONFLICT cannot update the same row twice.
+    """
+    merged: Dict[Tuple[str, date, ToolType], Dict[str, Any]] = {}
+    for delta in deltas:
+        key = (delta["user_id"], delta["day"], delta["tool"])
+        if key not in merged:
+            merged[key] = dict(delta)
+        else:
+            for field in COUNTER_FIELDS:
+                merged[key][field] += delta[field]
+    
+    if not merged:
+        return
+    
+    stmt = pg_insert(ScanDailyRollup).values(list(merged.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ScanDailyRollup.user_id, ScanDailyRollup.day, ScanDailyRollup.tool],
+        set_={
+            **{field: getattr(ScanDailyRollup, field) + stmt.excluded[field] for field in COUNTER_FIELDS},
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+def scan_counters():
+    """COUNTER_FIELDS totals over the scans of a grouped query."""
+    return [
+        func.count(Scan.id).label("scan_count"),
+        func.count(Scan.id).filter(Scan.status == ScanStatus.IN_PROGRESS).label("in_progress"),
+        *[func.coalesce(func.sum(Scan.summary[field].as_integer()), 0).label(field) for field in SUMMARY_FIELDS],
+    ]
+
+
+def daily_totals(*criteria: ColumnElement):
+    """Rollup totals per (user_id, day, tool) of the scans matching criteria."""
+    # Inline literal so the SELECT and GROUP BY expressions match exactly
+    day = cast(func.timezone(literal_column("'UTC'"), Scan.created_at), Date)
+    return (
+        select(Scan.user_id, day.label("day"), Scan.tool, *scan_counters())
+        .where(*criteria)
+        .group_by(Scan.user_id, day, Scan.tool)
+    )
+
+
+def project_totals(*criteria: ColumnElement):
+    """Rollup totals per (project_id, tool) of the project scans matching criteria."""
+    return (
+        select(Scan.project_id, Scan.tool, *scan_counters())
+        .where(Scan.project_id.isnot(None), *criteria)
+        .group_by(Scan.project_id, Scan.tool)
+    )
+
+
+async def backfill_daily_rollups(conn: AsyncConnection) -> None:
+    """
+    Build rollups from existing scans when the rollup table is empty.
+    
+    Runs at startup; once any rollup row exists this is a no-op.
+    Workers starting together may both find the table empty, so
+    conflicting rows are skipped rather than failing startup.
+    """
+    totals = daily_totals(~exists(select(ScanDailyRollup.user_id)))
+    columns = ["user_id", "day", "tool", *COUNTER_FIELDS]
+    await conn.execute(pg_insert(ScanDailyRollup).from_select(columns, totals).on_conflict_do_nothing())
+
+
+async def remove_daily_totals(db: AsyncSession, totals: Iterable[Any]) -> None:
+    """Subtract daily_totals rows of removed scans from the daily rollups."""
+    await record_rollups(db, [
+        {
+            "user_id": row.user_id,
+            "day": row.day,
+            "tool": row.tool,
+            **{field: -getattr(row, field) for field in COUNTER_FIELDS},
+        }
+        for row in totals
+    ])
+
+
+async def record_project_rollup(db: AsyncSession, scan: Scan) -> None:
+    """
+    Count a new scan in its project's rollup.
+    
+    Call after the scan is flushed, in the same transaction. The scan
+    becomes the latest of its tool: now() is the transaction time, the
+    same value its created_at default receives.
+    """
+    if scan.project_id is None:
+        return
+    
+    delta = scan_rollup(scan.user_id, scan.tool, scan.status, scan.summary or {})
+    stmt = pg_insert(ScanProjectRollup).values(
+        project_id=scan.project_id,
+        tool=scan.tool,
+        latest_scan_id=scan.id,
+        latest_scan_at=func.now(),
+        latest_status=scan.status,
+        **{field: delta[field] for field in COUNTER_FIELDS},
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ScanProjectRollup.project_id, ScanProjectRollup.tool],
+        set_={
+            **{field: getattr(ScanProjectRollup, field) + stmt.excluded[field] for field in COUNTER_FIELDS},
+            "latest_scan_id": stmt.excluded.latest_scan_id,
+            "latest_scan_at": stmt.excluded.latest_scan_at,
+            "latest_status": stmt.excluded.latest_status,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+async def remove_project_rollup(db: AsyncSession, scan: Scan) -> None:
+    """
+    Stop counting a scan that is about to be deleted in its project's rollup.
+    
+    The next latest scan is only looked up when the deleted scan was
+    the latest of its tool.
+    """
+    if scan.project_id is None:
+        return
+    
+    delta = scan_rollup(scan.user_id, scan.tool, scan.status, scan.summary or {}, sign=-1)
+    key = (ScanProjectRollup.project_id == scan.project_id, ScanProjectRollup.tool == scan.tool)
+    result = await db.execute(
+        update(ScanProjectRollup)
+        .where(*key)
+        .values(**{field: getattr(ScanProjectRollup, field) + delta[field] for field in COUNTER_FIELDS})
+        .returning(ScanProjectRollup.scan_count, ScanProjectRollup.latest_scan_id)
+    )
+    rollup = result.one_or_none()
+    if rollup is None:
+        return
+    
+    if rollup.scan_count <= 0:
+        await db.execute(delete(ScanProjectRollup).where(*key))
+        return
+    
+    if rollup.latest_scan_id == scan.id:
+        await refresh_latest_scan(db, scan.project_id, scan.tool, excluded_id=scan.id)
+
+
+async def refresh_latest_scan(
+    db: AsyncSession,
+    project_id: str,
+    tool: ToolType,
+    excluded_id: Optional[str] = None,
+) -> None:
+    """Point a project rollup at the latest scan of its tool, other than excluded_id."""
+    query = select(Scan.id, Scan.created_at, Scan.status).where(Scan.project_id == project_id, Scan.tool == tool)
+    if excluded_id is not None:
+        query = query.where(Scan.id != excluded_id)
+    result = await db.execute(query.order_by(Scan.created_at.desc(), Scan.id.desc()).limit(1))
+    latest = result.one_or_none()
+    await db.execute(
+        update(ScanProjectRollup)
+        .where(ScanProjectRollup.project_id == project_id, ScanProjectRollup.tool == tool)
+        .values(
+            latest_scan_id=latest.id if latest else None,
+            latest_scan_at=latest.created_at if latest else None,
+            latest_status=latest.status if latest else None,
+        )
+    )
+
+
+async def remove_project_totals(db: AsyncSession, totals: Iterable[Any]) -> None:
+    """
+    Subtract project_totals rows of removed scans from the project rollups.
+    
+    Call once the scans are gone. Rollups left without scans are
+    deleted, and those whose latest scan was removed are pointed at
+    the latest remaining one.
+    """
+    for row in totals:
+        key = (ScanProjectRollup.project_id == row.project_id, ScanProjectRollup.tool == row.tool)
+        result = await db.execute(
+            update(ScanProjectRollup)
+            .where(*key)
+            .values(**{
+                field: getattr(ScanProjectRollup, field) - getattr(row, field) for field in COUNTER_FIELDS
+            })
+            .returning(ScanProjectRollup.scan_count, ScanProjectRollup.latest_scan_id)
+        )
+        rollup = result.one_or_none()
+        if rollup is None:
+            continue
+        
+        if rollup.scan_count <= 0:
+            await db.execute(delete(ScanProjectRollup).where(*key))
+        elif not await db.scalar(select(exists().where(Scan.id == rollup.latest_scan_id))):
+            await refresh_latest_scan(db, row.project_id, row.tool)
+
+
+async def backfill_project_rollups(conn: AsyncConnection) -> None:
+    """
+    Build project rollups from existing scans when the table is empty.
+    
+    Runs at startup; once any project rollup row exists this is a no-op.
+    Conflicting rows from a worker starting at the same time are skipped.
+    """
+    ranked = select(
+        Scan.project_id,
+        Scan.tool,
+        Scan.id,
+        Scan.status,
+        Scan.summary,
+        Scan.created_at,
+        func.row_number().over(
+            partition_by=(Scan.project_id, Scan.tool),
+            order_by=(Scan.created_at.desc(), Scan.id.desc()),
+        ).label("rank"),
+    ).where(Scan.project_id.isnot(None)).subquery()
+    
+    latest = ranked.c.rank == 1
+    totals = (
+        select(
+            ranked.c.project_id,
+            ranked.c.tool,
+            func.count(ranked.c.id),
+            func.count(ranked.c.id).filter(ranked.c.status == ScanStatus.IN_PROGRESS),
+            *[func.coalesce(func.sum(ranked.c.summary[field].as_integer()), 0) for field in SUMMARY_FIELDS],
+            func.max(ranked.c.id).filter(latest),
+            func.max(ranked.c.created_at).filter(latest),
+            func.max(ranked.c.status).filter(latest),
+        )
+        .where(~exists(select(ScanProjectRollup.project_id)))
+        .group_by(ranked.c.project_id, ranked.c.tool)
+    )
+    
+    columns = ["project_id", "tool", *COUNTER_FIELDS, "latest_scan_id", "latest_scan_at", "latest_status"]
+    await conn.execute(pg_insert(ScanProjectRollup).from_select(columns, totals).on_conflict_do_nothing())
@@ -0,0 +1,38 @@
+"""
+Statement Timing Service
+
+Times every SQL statement executed through an engine once and hands
+the duration to each registered observer.
+
+The metrics service (DB_QUERY_DURATION) and the query stats service
+(per-request counts) both observe statements; sharing one pair of
+cursor listeners keeps the per-statement overhead to a single timer.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from typing import Callable, List
+import time
+
+# Called with the SQL text and its execution time in seconds
+StatementObserver = Callable[[str, float], None]
+
+
+def observe_statements(engine: AsyncEngine, observer: StatementObserver) -> None:
+    """Call observer after every statement executed through the engine."""
+    sync_engine = engine.sync_engine
+    observers: List[StatementObserver] = getattr(sync_engine, "_statement_observers", None)
+    if observers is None:
+        observers = sync_engine._statement_observers = []
+        
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            context._statement_start = time.perf_counter()
+        
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            seconds = time.perf_counter() - context._statement_start
+            for notify in observers:
+                notify(statement, seconds)
+    
+    observers.append(observer)
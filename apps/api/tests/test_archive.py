@@ -0,0 +1,83 @@
+"""Tests for the findings archive store and cache."""
+
+from fastapi import HTTPException
+import asyncio
+import os
+import pytest
+
+from config import settings
+from services import archive
+from services.archive import FindingsCache, LocalArchiveStore, read_archived_findings, write_archived_findings
+
+FINDINGS = [
+    {"id": "f1", "resource_type": "s3", "resource_id": "b1", "issue": "public", "severity": "high", "remediation": "block"},
+]
+
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "archive_dir", str(tmp_path))
+    monkeypatch.setattr(archive, "findings_cache", FindingsCache(1024 * 1024))
+    return tmp_path
+
+
+def test_store_put_get_delete(tmp_path):
+    store = LocalArchiveStore(str(tmp_path))
+    store.put("abcd", b"data")
+    store.put("abcd", b"ignored")
+    assert store.get("abcd") == b"data"
+    
+    store.delete("abcd")
+    store.delete("abcd")
+    with pytest.raises(FileNotFoundError):
+        store.get("abcd")
+
+
+def test_store_lists_keys_by_mtime_and_put_refreshes_it(tmp_path):
+    store = LocalArchiveStore(str(tmp_path))
+    store.put("aa11", b"old")
+    store.put("bb22", b"new")
+    for key in ("aa11", "bb22"):
+        os.utime(store._path(key), (1000, 1000))
+    assert sorted(store.list_keys(written_before=2000)) == ["aa11", "bb22"]
+    
+    store.put("bb22", b"new")
+    assert store.list_keys(written_before=2000) == ["aa11"]
+
+
+def test_cache_is_bounded_by_bytes():
+    cache = FindingsCache(max_bytes=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    assert cache.get("a") == b"1234"
+    cache.set("c", b"1234")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    
+    cache.set("big", b"x" * 11)
+    assert cache.get("big") is None
+    assert cache.get("a") is not None
+
+
+def test_read_returns_independent_copies(archive_dir):
+    async def run():
+        key = await write_archived_findings(FINDINGS)
+        first = await read_archived_findings(key)
+        first[0]["issue"] = "changed"
+        return await read_archived_findings(key)
+    
+    assert asyncio.run(run()) == FINDINGS
+
+
+def test_identical_findings_share_a_key(archive_dir):
+    async def run():
+        return await write_archived_findings(FINDINGS), await write_archived_findings(list(FINDINGS))
+    
+    first, second = asyncio.run(run())
+    assert first == second
+
+
+def test_missing_archive_is_unavailable(archive_dir):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(read_archived_findings("ff" * 32))
+    assert exc.value.status_code == 503
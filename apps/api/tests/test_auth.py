@@ -0,0 +1,74 @@
+"""Tests for the API key cache."""
+
+import pytest
+
+from services import auth
+from services.auth import APIKeyCache
+
+
+class Clock:
+    """Controllable stand-in for time.monotonic."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(auth.time, "monotonic", clock)
+    return clock
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = APIKeyCache(max_size=10, ttl=60, negative_ttl=5)
+    cache.set("key", "user_1")
+    cache.set("unknown", None)
+    
+    clock.now += 5
+    assert cache.get("key") == (True, "user_1")
+    assert cache.get("unknown") == (False, None)
+    
+    clock.now += 55
+    assert cache.get("key") == (False, None)
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = APIKeyCache(max_size=2, ttl=60, negative_ttl=5)
+    cache.set("a", "user_a")
+    cache.set("b", "user_b")
+    cache.get("a")
+    cache.set("c", "user_c")
+    
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, "user_a")
+    assert cache.get("c") == (True, "user_c")
+
+
+def test_disabled_cache_stores_nothing(clock):
+    cache = APIKeyCache(max_size=0, ttl=60, negative_ttl=5)
+    cache.set("a", "user_a")
+    assert cache.get("a") == (False, None)
+
+
+def test_invalidation(clock):
+    cache = APIKeyCache(max_size=10, ttl=60, negative_ttl=5)
+    cache.set("old", "user_1")
+    cache.set("new", "user_1")
+    cache.set("other", "user_2")
+    
+    cache.invalidate("other")
+    assert cache.get("other") == (False, None)
+    
+    cache.invalidate_user("user_1")
+    assert cache.get("old") == (False, None)
+    assert cache.get("new") == (False, None)
+
+
+def test_raw_keys_are_not_stored(clock):
+    cache = APIKeyCache(max_size=10, ttl=60, negative_ttl=5)
+    cache.set("secret-key", "user_1")
+    assert "secret-key" not in cache._entries
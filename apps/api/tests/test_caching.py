@@ -0,0 +1,56 @@
+"""Tests for conditional GET support."""
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+import pytest
+
+from services.caching import CACHE_CONTROL, conditional_response, etag_matches, make_etag
+
+ETAG = make_etag("scan", "s1", "2026-01-05T12:00:00+00:00")
+
+
+def test_make_etag_is_stable_and_quoted():
+    assert ETAG == make_etag("scan", "s1", "2026-01-05T12:00:00+00:00")
+    assert ETAG.startswith('"') and ETAG.endswith('"')
+    assert make_etag("a", "b") != make_etag("ab")
+
+
+@pytest.mark.parametrize("header", [ETAG, f"W/{ETAG}", f'"other", {ETAG}', f' "other" ,W/{ETAG} ', "*"])
+def test_etag_matches(header):
+    assert etag_matches(header, ETAG)
+
+
+@pytest.mark.parametrize("header", [None, "", '"other"', ETAG.strip('"'), f"W/{ETAG[:-2]}\""])
+def test_etag_does_not_match(header):
+    assert not etag_matches(header, ETAG)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    loads = []
+    
+    @app.get("/thing")
+    async def thing(request: Request, response: Response):
+        not_modified = conditional_response(request, response, ETAG)
+        if not_modified:
+            return not_modified
+        loads.append(1)
+        return {"loaded": len(loads)}
+    
+    return TestClient(app)
+
+
+def test_response_carries_etag(client):
+    response = client.get("/thing")
+    assert response.status_code == 200
+    assert response.headers["etag"] == ETAG
+    assert response.headers["cache-control"] == CACHE_CONTROL
+
+
+def test_matching_if_none_match_returns_304_without_loading(client):
+    response = client.get("/thing", headers={"If-None-Match": f"W/{ETAG}"})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == ETAG
+    assert client.get("/thing").json() == {"loaded": 1}
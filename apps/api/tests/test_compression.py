@@ -0,0 +1,91 @@
+"""Tests for request body decompression."""
+
+from fastapi import HTTPException
+import gzip
+import pytest
+
+from services.compression import (
+    DECOMPRESS_STEP_BYTES,
+    GzipStreamDecompressor,
+    ZstdStreamDecompressor,
+    get_decompressor,
+    zstandard,
+)
+
+
+def decompress_all(decompressor, data: bytes, chunk_size: int = 4096) -> bytes:
+    pieces = []
+    for start in range(0, len(data), chunk_size):
+        pieces.extend(decompressor.decompress(data[start:start + chunk_size]))
+    pieces.append(decompressor.flush())
+    return b"".join(pieces)
+
+
+def test_gzip_round_trip_in_bounded_steps():
+    body = b"x" * (3 * DECOMPRESS_STEP_BYTES)
+    pieces = list(GzipStreamDecompressor().decompress(gzip.compress(body)))
+    assert b"".join(pieces) == body
+    assert max(len(piece) for piece in pieces) <= DECOMPRESS_STEP_BYTES
+
+
+def test_gzip_truncated_body_is_rejected():
+    decompressor = GzipStreamDecompressor()
+    list(decompressor.decompress(gzip.compress(b"x" * 1000)[:-10]))
+    with pytest.raises(HTTPException) as exc:
+        decompressor.flush()
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard not installed")
+def test_zstd_round_trip():
+    body = b"scan data " * 10000
+    data = zstandard.ZstdCompressor().compress(body)
+    assert decompress_all(ZstdStreamDecompressor(len(body)), data) == body
+
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard not installed")
+@pytest.mark.parametrize("streamed", [False, True])
+def test_zstd_truncated_body_is_rejected(streamed):
+    compressor = zstandard.ZstdCompressor(write_checksum=True)
+    if streamed:
+        stream = compressor.compressobj()
+        data = stream.compress(b"scan data " * 10000) + stream.flush()
+    else:
+        data = compressor.compress(b"scan data " * 10000)
+    
+    for cut in (len(data) - 1, len(data) // 2, 4):
+        with pytest.raises(HTTPException) as exc:
+            decompress_all(ZstdStreamDecompressor(10 ** 6), data[:cut])
+        assert exc.value.detail == "Truncated zstd body"
+
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard not installed")
+def test_zstd_concatenated_frames():
+    compressor = zstandard.ZstdCompressor()
+    data = compressor.compress(b"first ") + compressor.compress(b"second")
+    assert decompress_all(ZstdStreamDecompressor(100), data, chunk_size=3) == b"first second"
+
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard not installed")
+def test_zstd_bomb_stops_at_limit():
+    limit = 2 * DECOMPRESS_STEP_BYTES
+    bomb = zstandard.ZstdCompressor().compress(b"\0" * (256 * 1024 * 1024))
+    assert len(bomb) < 64 * 1024
+    
+    decompressor = ZstdStreamDecompressor(limit)
+    produced = 0
+    with pytest.raises(HTTPException) as exc:
+        for piece in decompressor.decompress(bomb):
+            produced += len(piece)
+    assert exc.value.status_code == 413
+    assert produced <= limit
+
+
+def test_get_decompressor():
+    assert get_decompressor("", 100) is None
+    assert get_decompressor("identity", 100) is None
+    assert isinstance(get_decompressor("GZIP", 100), GzipStreamDecompressor)
+    with pytest.raises(HTTPException) as exc:
+        get_decompressor("br", 100)
+    assert exc.value.status_code == 415
+
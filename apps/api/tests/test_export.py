@@ -0,0 +1,105 @@
+"""Tests for streamed scan exports."""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import asyncio
+import csv
+import io
+import json
+import pytest
+
+from models import ScanStatus, ToolType
+from services import export
+from services.export import CSV_COLUMNS, iter_export
+
+CREATED_AT = datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc)
+
+NO_FINDING = dict.fromkeys(["finding_id", "resource_type", "resource_id", "issue", "severity", "remediation"])
+
+
+def export_row(scan_id: str, findings=None, finding_id=None, **columns):
+    """One row of the export query: a scan joined to one of its findings, or to none."""
+    row = {
+        "id": scan_id,
+        "tool": ToolType.VERIFY,
+        "provider": "aws",
+        "region": "us-east-1",
+        "status": ScanStatus.COMPLETED,
+        "summary": {"issues_found": 1},
+        "findings": findings,
+        "findings_archive_key": None,
+        "project_id": None,
+        "created_at": CREATED_AT,
+        "updated_at": None,
+        **NO_FINDING,
+    }
+    if finding_id is not None:
+        row.update(
+            finding_id=finding_id, resource_type="s3", resource_id=f"bucket-{finding_id}",
+            issue="public bucket", severity="high", remediation="block public access",
+        )
+    row.update(columns)
+    return SimpleNamespace(**row)
+
+
+LEGACY_FINDING = {"id": "l1", "resource_type": "ec2", "resource_id": "i-1", "issue": "open port", "severity": "low", "remediation": "close it"}
+
+ROWS = [
+    export_row("s1", finding_id="f1"),
+    export_row("s1", finding_id="f2"),
+    export_row("s2", findings=[LEGACY_FINDING]),
+    export_row("s3", findings=[]),
+]
+
+
+class FakeSession:
+    """Session whose stream() yields fixed rows."""
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    async def stream(self, query):
+        async def rows():
+            for row in ROWS:
+                yield row
+        return rows()
+
+
+def run_export(export_format: str) -> list:
+    async def collect():
+        return [chunk async for chunk in iter_export("user", export_format)]
+    return asyncio.run(collect())
+
+
+@pytest.fixture(autouse=True)
+def fake_session(monkeypatch):
+    monkeypatch.setattr(export, "async_session_maker", FakeSession)
+
+
+def test_ndjson_has_one_line_per_scan():
+    lines = [json.loads(line) for line in "".join(run_export("ndjson")).splitlines()]
+    
+    assert [line["id"] for line in lines] == ["s1", "s2", "s3"]
+    assert [f["id"] for f in lines[0]["findings"]] == ["f1", "f2"]
+    assert lines[1]["findings"] == [LEGACY_FINDING]
+    assert lines[2]["findings"] == []
+    assert lines[0]["summary"] == {"issues_found": 1}
+    assert lines[0]["created_at"] == CREATED_AT.isoformat()
+
+
+def test_csv_has_one_row_per_finding():
+    rows = list(csv.reader(io.StringIO("".join(run_export("csv")))))
+    
+    assert rows[0] == CSV_COLUMNS
+    assert [(row[0], row[6]) for row in rows[1:]] == [("s1", "f1"), ("s1", "f2"), ("s2", "l1"), ("s3", "")]
+
+
+def test_output_is_flushed_in_chunks(monkeypatch):
+    whole = "".join(run_export("ndjson"))
+    monkeypatch.setattr(export, "EXPORT_FLUSH_BYTES", 1)
+    chunks = run_export("ndjson")
+    assert len(chunks) > 1
+    assert "".join(chunks) == whole
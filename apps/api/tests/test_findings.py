@@ -0,0 +1,61 @@
+"""Tests for finding fingerprints, diffs and legacy blobs."""
+
+from datetime import datetime, timezone
+from pydantic import ValidationError
+import pytest
+
+from models import ToolType
+from services.findings import FindingScope, diff_findings, finding_fingerprint, finding_rows, legacy_findings
+
+SCOPE = FindingScope(ToolType.VERIFY, "aws", "us-east-1")
+
+
+def finding(resource_id: str, issue: str = "public bucket", finding_id: str = "f1"):
+    return {
+        "id": finding_id,
+        "resource_type": "s3",
+        "resource_id": resource_id,
+        "issue": issue,
+        "severity": "high",
+        "remediation": "block public access",
+    }
+
+
+def test_fingerprint_ignores_cli_finding_id():
+    assert finding_fingerprint(SCOPE, finding("b1", finding_id="a")) == finding_fingerprint(SCOPE, finding("b1", finding_id="b"))
+
+
+def test_fingerprint_depends_on_scope_and_resource():
+    base = finding_fingerprint(SCOPE, finding("b1"))
+    assert finding_fingerprint(SCOPE._replace(region="eu-west-1"), finding("b1")) != base
+    assert finding_fingerprint(SCOPE._replace(region=None), finding("b1")) != base
+    assert finding_fingerprint(SCOPE, finding("b2")) != base
+    assert finding_fingerprint(SCOPE, finding("b1", issue="unencrypted")) != base
+
+
+def test_diff_findings():
+    base = [finding("b1"), finding("b2"), finding("b2")]
+    head = [finding("b2", finding_id="new-id"), finding("b3")]
+    new, resolved, unchanged = diff_findings(base, head, SCOPE, SCOPE)
+    assert [f["resource_id"] for f in new] == ["b3"]
+    assert [f["resource_id"] for f in resolved] == ["b1"]
+    assert unchanged == 1
+
+
+def test_diff_findings_across_scopes():
+    other = SCOPE._replace(provider="gcp")
+    new, resolved, unchanged = diff_findings([finding("b1")], [finding("b1")], SCOPE, other)
+    assert len(new) == 1 and len(resolved) == 1 and unchanged == 0
+
+def test_finding_rows():
+    created_at = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    rows = finding_rows("scan-1", created_at, SCOPE, [finding("b1"), finding("b2")], start=10)
+    assert [row["position"] for row in rows] == [10, 11]
+    assert rows[0]["scan_created_at"] == created_at
+    assert rows[1]["fingerprint"] == finding_fingerprint(SCOPE, finding("b2"))
+
+
+def test_legacy_findings():
+    assert legacy_findings([finding("b1")]) == [finding("b1")]
+    with pytest.raises(ValidationError):
+        legacy_findings([{"id": "f1", "issue": "missing fields"}])
@@ -0,0 +1,48 @@
+"""Tests for the asynchronous ingest queue."""
+
+import asyncio
+import pytest
+
+from models import ScanStatus, ToolType
+from services.ingest import NewScan
+from services.ingest_queue import COMPLETED, FINDING_OVERHEAD_BYTES, IngestQueue, IngestQueueFull, scan_size
+
+
+def new_scan(scan_id: str, findings: int) -> NewScan:
+    finding = {"id": "f", "resource_type": "s3", "resource_id": "b", "issue": "x" * 92, "severity": "high", "remediation": ""}
+    return NewScan(scan_id, "user", ToolType.VERIFY, ScanStatus.COMPLETED, "aws", None, {}, [finding] * findings)
+
+
+def test_scan_size():
+    assert scan_size(new_scan("s", 0)) == 0
+    assert scan_size(new_scan("s", 2)) == 2 * (FINDING_OVERHEAD_BYTES + 100)
+
+
+def test_submit_requires_running_queue():
+    queue = IngestQueue(max_size=10, max_bytes=10_000, workers=1, batch_size=10, status_retention=100)
+    with pytest.raises(IngestQueueFull):
+        queue.submit(new_scan("s", 1))
+
+
+def test_byte_budget():
+    async def run():
+        queue = IngestQueue(max_size=10, max_bytes=2_000, workers=1, batch_size=10, status_retention=100)
+        release = asyncio.Event()
+        
+        async def write(scans):
+            await release.wait()
+        
+        queue._write = write
+        queue.start()
+        # Larger than the budget on its own, accepted while nothing is queued
+        queue.submit(new_scan("big", 3))
+        with pytest.raises(IngestQueueFull):
+            queue.submit(new_scan("small", 1))
+        
+        release.set()
+        await queue.stop(timeout=5)
+        assert queue._bytes == 0
+        assert queue.status("big", "user") == (COMPLETED, None)
+        assert queue.status("big", "someone-else") is None
+    
+    asyncio.run(run())
@@ -0,0 +1,39 @@
+"""Tests for NDJSON line splitting."""
+
+import asyncio
+import pytest
+
+from services.ndjson import NDJSONError, iter_lines
+
+
+async def chunked(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+def lines(*chunks: bytes, max_line_bytes: int = 64):
+    async def collect():
+        return [line async for line in iter_lines(chunked(*chunks), max_line_bytes)]
+    return asyncio.run(collect())
+
+
+def test_lines_split_across_chunks():
+    assert lines(b'{"a"', b': 1}\n{"b": 2', b'}\n', b'{"c": 3}') == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
+
+def test_boundary_on_newline():
+    assert lines(b"one", b"\n", b"\ntwo\n", b"") == [b"one", b"two"]
+
+
+def test_blank_lines_and_crlf_are_skipped():
+    assert lines(b"one\r\n\r\n  \n", b"two\r", b"\n") == [b"one", b"two"]
+
+
+def test_single_byte_chunks():
+    body = b'{"x": 1}\n{"y": 2}\n'
+    assert lines(*[body[i:i + 1] for i in range(len(body))]) == [b'{"x": 1}', b'{"y": 2}']
+
+
+def test_partial_line_over_limit():
+    with pytest.raises(NDJSONError):
+        lines(b"ok\n", b"x" * 40, b"x" * 40, max_line_bytes=64)
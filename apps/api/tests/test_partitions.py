@@ -0,0 +1,38 @@
+"""Tests for monthly partition helpers."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from models import ScanFinding
+from services.findings import findings_of, findings_of_scans
+from services.partitions import add_months, month_start, partition_month, partition_name
+
+
+def test_month_start_uses_utc():
+    moment = datetime(2026, 3, 1, 2, 0, tzinfo=timezone(timedelta(hours=5)))
+    assert month_start(moment) == datetime(2026, 2, 1, tzinfo=timezone.utc)
+
+
+def test_add_months_across_years():
+    month = datetime(2026, 11, 1, tzinfo=timezone.utc)
+    assert add_months(month, 2) == datetime(2027, 1, 1, tzinfo=timezone.utc)
+    assert add_months(month, -11) == datetime(2025, 12, 1, tzinfo=timezone.utc)
+
+
+def test_partition_names_round_trip():
+    month = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert partition_name("scans", month) == "scans_p2026_01"
+    assert partition_month("scans", "scans_p2026_01") == month
+    assert partition_month("scans", "scan_findings_p2026_01") is None
+    assert partition_month("scans", "scans_default") is None
+
+
+def test_findings_are_matched_on_the_partition_key():
+    created_at = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    scans = [SimpleNamespace(id="s1", created_at=created_at), SimpleNamespace(id="s2", created_at=created_at)]
+    for criteria in (findings_of(ScanFinding, "s1", created_at), findings_of_scans(scans)):
+        sql = str(criteria.compile(dialect=postgresql.dialect()))
+        assert "scan_findings.scan_created_at" in sql
+        assert "IS NULL" not in sql
@@ -0,0 +1,49 @@
+"""Tests for scan rollups."""
+
+from datetime import date
+from sqlalchemy.dialects import postgresql
+import asyncio
+
+from models import ScanStatus, ToolType
+from services.rollups import record_rollups, scan_rollup
+
+DAY = date(2026, 1, 5)
+
+
+def upserted_rows(session):
+    """Rows of the single rollup upsert a session executed."""
+    [(statement, _)] = session.statements_on("scan_daily_rollups")
+    params = statement.compile(dialect=postgresql.dialect()).params
+    rows = {}
+    for name, value in params.items():
+        field, _, row = name.rpartition("_m")
+        if field and row.isdigit():
+            rows.setdefault(int(row), {})[field] = value
+    return [rows[i] for i in sorted(rows)]
+
+
+def test_scan_rollup_counts_summary():
+    delta = scan_rollup("u", ToolType.VERIFY, ScanStatus.IN_PROGRESS, {"issues_found": 3, "high": "2"}, day=DAY, sign=-1)
+    assert (delta["scan_count"], delta["in_progress"], delta["issues_found"], delta["high"], delta["low"]) == (-1, -1, -3, -2, 0)
+
+
+def test_record_rollups_merges_duplicate_keys(session):
+    deltas = [
+        scan_rollup("u", ToolType.VERIFY, ScanStatus.COMPLETED, {"issues_found": 2, "high": 2}, day=DAY),
+        scan_rollup("u", ToolType.COMPLY, ScanStatus.COMPLETED, {"issues_found": 1}, day=DAY),
+        scan_rollup("u", ToolType.VERIFY, ScanStatus.IN_PROGRESS, {"issues_found": 3, "low": 3}, day=DAY),
+        scan_rollup("u", ToolType.VERIFY, ScanStatus.COMPLETED, {"issues_found": 2, "high": 2}, day=DAY, sign=-1),
+    ]
+    asyncio.run(record_rollups(session, deltas))
+    
+    verify, comply = upserted_rows(session)
+    assert (verify["tool"], verify["scan_count"], verify["in_progress"]) == (ToolType.VERIFY, 1, 1)
+    assert (verify["issues_found"], verify["high"], verify["low"]) == (3, 0, 3)
+    assert (comply["tool"], comply["scan_count"], comply["issues_found"]) == (ToolType.COMPLY, 1, 1)
+    # The caller's deltas are left as they were
+    assert deltas[0]["scan_count"] == 1
+
+
+def test_record_rollups_without_deltas(session):
+    asyncio.run(record_rollups(session, []))
+    assert session.executed == []
@@ -0,0 +1,27 @@
+"""Tests for scan listing helpers."""
+
+from datetime import datetime, timezone
+from fastapi import HTTPException
+from types import SimpleNamespace
+import json
+import pytest
+
+from routers.scans import ScanJSONResponse, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 3, 1, 12, 30, 5, 123456, tzinfo=timezone.utc)
+    cursor = encode_cursor(SimpleNamespace(created_at=created_at, id="scan|1"))
+    assert decode_cursor(cursor) == (created_at, "scan|1")
+
+
+@pytest.mark.parametrize("cursor", ["zz", "bm90LWEtY3Vyc29y", "!!!"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_response_keeps_z_suffix():
+    body = ScanJSONResponse({"created_at": datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)}).body
+    assert json.loads(body) == {"created_at": "2026-03-01T12:00:00Z"}
@@ -1,11 +1,13 @@
 import { auth } from '@clerk/nextjs/server'
 import { NextResponse } from 'next/server'
-import { getUser, fetchAPI } from '@/lib/api'
+import { getUser, getUserScan } from '@/lib/api'
+import { proxyConditional } from '@/lib/proxy'
 
 /**
  * GET /api/user/scans/[id]
  * 
  * Fetches a specific scan by ID for the current user.
+ * The backend's ETag is passed through for conditional requests.
  */
 export async function GET(
   request: Request,
@@ -31,11 +33,9 @@ export async function GET(
     }
     
     // Fetch the specific scan using user's API key
-    const scan = await fetchAPI(`/api/scans/${params.id}`, {
-      userApiKey: user.api_key,
-    })
+    const scan = await getUserScan(user.api_key, params.id, request.headers.get('if-none-match'))
     
-    return NextResponse.json(scan)
+    return proxyConditional(scan)
   } catch (error) {
     console.error('[API /user/scans/[id]] Error:', error)
     return NextResponse.json(
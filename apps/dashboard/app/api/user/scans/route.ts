@@ -1,12 +1,14 @@
 import { auth } from '@clerk/nextjs/server'
 import { NextResponse } from 'next/server'
 import { getUser, getUserScans } from '@/lib/api'
+import { proxyConditional } from '@/lib/proxy'
 
 /**
  * GET /api/user/scans
  * 
  * Fetches the current user's scans using their personal API key.
  * This ensures each user only sees their own data.
+ * The backend's ETag is passed through for conditional requests.
  */
 export async function GET(request: Request) {
   try {
@@ -30,14 +32,15 @@ export async function GET(request: Request) {
       )
     }
     
-    // Parse query params for limit
+    // Parse query params for limit and optional findings
     const { searchParams } = new URL(request.url)
     const limit = parseInt(searchParams.get('limit') || '10', 10)
+    const include = searchParams.get('include')
     
     // Fetch scans using the user's personal API key
-    const scans = await getUserScans(user.api_key, limit)
+    const scans = await getUserScans(user.api_key, limit, include, request.headers.get('if-none-match'))
     
-    return NextResponse.json({ scans })
+    return proxyConditional(scans, (data) => ({ scans: data }))
   } catch (error) {
     console.error('[API /user/scans] Error:', error)
     return NextResponse.json(
@@ -1,14 +1,16 @@
 import { auth } from '@clerk/nextjs/server'
 import { NextResponse } from 'next/server'
-import { getUser, getUserDashboardStats } from '@/lib/api'
+import { getUser, getUserDashboardStatsConditional } from '@/lib/api'
+import { proxyConditional } from '@/lib/proxy'
 
 /**
  * GET /api/user/stats
  * 
  * Fetches the current user's dashboard stats using their personal API key.
  * This ensures each user only sees their own data.
+ * The backend's ETag is passed through for conditional requests.
  */
-export async function GET() {
+export async function GET(request: Request) {
   try {
     // Get the current user's Clerk ID from the session
     const { userId } = await auth()
@@ -31,9 +33,9 @@ export async function GET() {
     }
     
     // Fetch stats using the user's personal API key
-    const stats = await getUserDashboardStats(user.api_key)
+    const stats = await getUserDashboardStatsConditional(user.api_key, request.headers.get('if-none-match'))
     
-    return NextResponse.json(stats)
+    return proxyConditional(stats)
   } catch (error) {
     console.error('[API /user/stats] Error:', error)
     return NextResponse.json(
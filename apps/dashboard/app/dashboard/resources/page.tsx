@@ -55,7 +55,7 @@ export default function ResourcesPage() {
       }
 
       try {
-        const response = await fetch('/api/user/scans')
+        const response = await fetch('/api/user/scans?include=findings')
         if (response.ok) {
           const data = await response.json()
           
@@ -7,6 +7,7 @@ import { useAuth } from '@clerk/nextjs'
 import { useParams } from 'next/navigation'
 import Link from 'next/link'
 import { formatDistanceToNow } from 'date-fns'
+import type { Finding } from '@/lib/api'
 
 interface Scan {
   id: string
@@ -22,14 +23,7 @@ interface Scan {
     medium: number
     low: number
   }
-  findings: Array<{
-    id: string
-    resource_type: string
-    resource_id: string
-    issue: string
-    severity: string
-    remediation: string
-  }>
+  findings: Finding[] | null
   created_at: string
 }
 
@@ -191,7 +185,7 @@ export default function ScanDetailPage() {
       <Card>
         <Title>Findings</Title>
         
-        {scan.findings.length === 0 ? (
+        {!scan.findings?.length ? (
           <div className="mt-6 text-center py-8 bg-[--bg-alt] rounded-lg">
             <CheckCircle className="w-12 h-12 text-green-500 mx-auto mb-4" />
             <Text className="text-[--text-light]">No issues found</Text>
@@ -210,7 +204,7 @@ export default function ScanDetailPage() {
               </TableRow>
             </TableHead>
             <TableBody>
-              {scan.findings.map((finding) => (
+              {(scan.findings ?? []).map((finding) => (
                 <TableRow key={finding.id}>
                   <TableCell>
                     <Badge color={severityColors[finding.severity] || 'gray'}>
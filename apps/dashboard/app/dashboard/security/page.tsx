@@ -52,7 +52,7 @@ export default function SecurityPage() {
       }
 
       try {
-        const response = await fetch('/api/user/scans')
+        const response = await fetch('/api/user/scans?include=findings')
         if (response.ok) {
           const data = await response.json()
           
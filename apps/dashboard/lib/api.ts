@@ -12,10 +12,18 @@ const ADMIN_API_KEY = process.env.INFRAIQ_BACKEND_API_KEY || ''
 interface FetchOptions extends RequestInit {
   skipAuth?: boolean
   userApiKey?: string  // Pass user's personal key for user-specific requests
+  ifNoneMatch?: string | null  // ETag the caller already has, see fetchAPIConditional
 }
 
-export async function fetchAPI<T>(endpoint: string, options: FetchOptions = {}): Promise<T> {
-  const { skipAuth, userApiKey, ...fetchOptions } = options
+// Result of a conditional request; data is null when notModified
+export interface Conditional<T> {
+  notModified: boolean
+  etag: string | null
+  data: T | null
+}
+
+async function requestAPI(endpoint: string, options: FetchOptions): Promise<Response> {
+  const { skipAuth, userApiKey, ifNoneMatch, ...fetchOptions } = options
   
   const headers: Record<string, string> = {
     'Content-Type': 'application/json',
@@ -26,6 +34,9 @@ export async function fetchAPI<T>(endpoint: string, options: FetchOptions = {}):
   if (!skipAuth && apiKey) {
     headers['X-API-Key'] = apiKey
   }
+  if (ifNoneMatch) {
+    headers['If-None-Match'] = ifNoneMatch
+  }
   
   const url = `${API_BASE_URL}${endpoint}`
   
@@ -35,15 +46,35 @@ export async function fetchAPI<T>(endpoint: string, options: FetchOptions = {}):
     cache: 'no-store',
   })
   
-  if (!response.ok) {
+  if (!response.ok && response.status !== 304) {
     const text = await response.text()
     console.error(`[API] Error ${response.status}: ${text}`)
     throw new Error(`API error: ${response.status} ${response.statusText}`)
   }
   
+  return response
+}
+
+export async function fetchAPI<T>(endpoint: string, options: FetchOptions = {}): Promise<T> {
+  const response = await requestAPI(endpoint, options)
   return response.json()
 }
 
+/**
+ * Fetch with the browser's If-None-Match forwarded to the backend.
+ * 
+ * Returns the backend's ETag so proxy routes can pass it back, and
+ * notModified instead of a body when the backend answers 304.
+ */
+export async function fetchAPIConditional<T>(endpoint: string, options: FetchOptions = {}): Promise<Conditional<T>> {
+  const response = await requestAPI(endpoint, options)
+  const etag = response.headers.get('ETag')
+  if (response.status === 304) {
+    return { notModified: true, etag, data: null }
+  }
+  return { notModified: false, etag, data: await response.json() }
+}
+
 // Types
 export interface DashboardStats {
   resources_monitored: number
@@ -65,6 +96,15 @@ export interface Recommendation {
   action_url: string
 }
 
+export interface Finding {
+  id: string
+  resource_type: string
+  resource_id: string
+  issue: string
+  severity: string
+  remediation: string
+}
+
 export interface Scan {
   id: string
   tool: string
@@ -78,14 +118,16 @@ export interface Scan {
     medium: number
     low: number
   }
+  findings?: Finding[] | null  // null unless listed with include=findings
   created_at: string
 }
 
 interface ScansListResponse {
   scans: Scan[]
-  total: number
+  total: number | null  // null unless listed with include_total=true
   limit: number
   offset: number
+  next_cursor: string | null
 }
 
 export interface User {
@@ -112,7 +154,7 @@ export interface UserStats {
 // ============================================
 
 export async function getUser(clerkId: string): Promise<User> {
-  return fetchAPI<User>(`/api/users/me?clerk_id=${clerkId}`)
+  return fetchAPI<User>(`/api/users/me?clerk_id=${encodeURIComponent(clerkId)}`)
 }
 
 export async function upsertUser(clerkId: string, email: string, name?: string | null): Promise<User> {
@@ -130,17 +172,35 @@ export async function getUserDashboardStats(userApiKey: string): Promise<Dashboa
   return fetchAPI<DashboardStats>('/api/dashboard/stats', { userApiKey })
 }
 
+export async function getUserDashboardStatsConditional(
+  userApiKey: string,
+  ifNoneMatch?: string | null,
+): Promise<Conditional<DashboardStats>> {
+  return fetchAPIConditional<DashboardStats>('/api/dashboard/stats', { userApiKey, ifNoneMatch })
+}
+
 export async function getUserRecommendations(userApiKey: string): Promise<Recommendation[]> {
   return fetchAPI<Recommendation[]>('/api/dashboard/recommendations', { userApiKey })
 }
 
-export async function getUserScans(userApiKey: string, limit = 10): Promise<Scan[]> {
-  const response = await fetchAPI<ScansListResponse>(`/api/scans?limit=${limit}`, { userApiKey })
-  return response.scans
+export async function getUserScans(
+  userApiKey: string,
+  limit = 10,
+  include?: string | null,
+  ifNoneMatch?: string | null,
+): Promise<Conditional<Scan[]>> {
+  const params = new URLSearchParams({ limit: String(limit) })
+  if (include === 'findings') params.set('include', 'findings')
+  const result = await fetchAPIConditional<ScansListResponse>(`/api/scans?${params}`, { userApiKey, ifNoneMatch })
+  return { ...result, data: result.data ? result.data.scans : null }
+}
+
+export async function getUserScan(userApiKey: string, scanId: string, ifNoneMatch?: string | null): Promise<Conditional<Scan>> {
+  return fetchAPIConditional<Scan>(`/api/scans/${encodeURIComponent(scanId)}`, { userApiKey, ifNoneMatch })
 }
 
 export async function getUserStats(clerkId: string): Promise<UserStats> {
-  return fetchAPI<UserStats>(`/api/users/me/stats?clerk_id=${clerkId}`)
+  return fetchAPI<UserStats>(`/api/users/me/stats?clerk_id=${encodeURIComponent(clerkId)}`)
 }
 
 export async function healthCheck(): Promise<{ status: string; database: string }> {
@@ -0,0 +1,26 @@
+import { NextResponse } from 'next/server'
+import type { Conditional } from './api'
+
+// Per-user data: browsers may keep it but must revalidate before reuse
+const CACHE_CONTROL = 'private, no-cache'
+
+/**
+ * Respond to the browser with a proxied conditional result.
+ * 
+ * Passes the backend's ETag through, so the browser's next request
+ * carries it as If-None-Match, and turns a backend 304 into a 304.
+ */
+export function proxyConditional<T>(
+  result: Conditional<T>,
+  toBody: (data: T) => unknown = (data) => data,
+): NextResponse {
+  const headers: Record<string, string> = { 'Cache-Control': CACHE_CONTROL }
+  if (result.etag) {
+    headers['ETag'] = result.etag
+  }
+  
+  if (result.notModified) {
+    return new NextResponse(null, { status: 304, headers })
+  }
+  return NextResponse.json(toBody(result.data as T), { headers })
+}